@@ -21,6 +21,9 @@ def parse_args(argv=None):
     p.add_argument("--prdSe", default=os.getenv("KOSIS_PRDSE", None))
     p.add_argument("--start", dest="startPrdDe", default=os.getenv("KOSIS_START", None))
     p.add_argument("--end", dest="endPrdDe", default=os.getenv("KOSIS_END", None))
+    p.add_argument("--workers", type=int, default=int(os.getenv("KOSIS_USERSTATS_WORKERS", "4")))
+    p.add_argument("--retry-failed", action="store_true", help="실패 기록에 남은 userStatsId만 재수집")
+    p.add_argument("--max-attempts", type=int, default=8, help="이 횟수 이상 실패한 userStatsId는 재시도하지 않음")
     return p.parse_args(argv)
 
 
@@ -38,6 +41,9 @@ def main(argv=None):
             prdSe=args.prdSe,
             startPrdDe=args.startPrdDe,
             endPrdDe=args.endPrdDe,
+            workers=args.workers,
+            retry_failed=args.retry_failed,
+            max_attempts=args.max_attempts,
         )
     if args.mode == "direct":
         from src.direct_catalog import run_direct_catalog
@@ -3,11 +3,18 @@
 from __future__ import annotations
 
 import argparse
+import json
+import os
 
 import pandas as pd
 from tqdm import tqdm
 
+from src import store
 from src.fetcher import fetch_row
+from src.scheduler import catalog_key
+from src.utils import backoff_delay
+
+FAIL_SRC = "fetch"
 
 
 def main() -> None:
@@ -18,13 +25,38 @@ def main() -> None:
         help="수집용 CSV (필드: mode/prdSe/startPrdDe/endPrdDe/…)",
     )
     parser.add_argument("--out", default="out_data.parquet")
+    parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="실패 기록(fetch_failures)에 남은 행만 재수집하고 결과를 --out에 덧붙임",
+    )
+    parser.add_argument("--backoff", type=float, default=2.0, help="재시도 대기 기본값(초, 시도마다 2배)")
+    parser.add_argument("--max-attempts", type=int, default=8, help="이 횟수 이상 실패한 행은 재시도하지 않음")
     args = parser.parse_args()
 
-    catalog = pd.read_csv(args.catalog, dtype=str).fillna("")
+    # DB는 실패 기록을 읽고 쓸 때만 잠깐 열고 바로 닫음 → 긴 수집 중에도 다른 프로세스가 DB를 쓸 수 있음
+    with store.session():
+        store.init()
+        failed = store.pending_failures(FAIL_SRC)
+        if args.retry_failed:
+            due = store.due_failures(
+                FAIL_SRC, args.max_attempts, lambda n: backoff_delay(n, base=args.backoff)
+            )
+    attempts = dict(zip(failed["key"], failed["attempts"])) if not failed.empty else {}
+    failures = store.FailureLog(FAIL_SRC)
+    if args.retry_failed:
+        rows = [json.loads(payload) for payload in due["row"]]
+        waiting = int((failed["attempts"] < args.max_attempts).sum()) - len(rows)
+        print(f"[fetch] 재시도 대상 {len(rows):,} 행 (대기 시간이 남은 {waiting:,} 행은 다음 실행으로)")
+    else:
+        catalog = pd.read_csv(args.catalog, dtype=str).fillna("")
+        rows = [row.to_dict() for _, row in catalog.iterrows()]
+
     out_rows = []
-    for _, row in tqdm(catalog.iterrows(), total=len(catalog)):
+    for row in tqdm(rows, total=len(rows)):
+        key = catalog_key(row)
         try:
-            df = fetch_row(row.to_dict())
+            df = fetch_row(row)
             df.insert(0, "logical_name", row.get("logical_name", ""))
             df.insert(1, "orgId", row.get("orgId", ""))
             df.insert(2, "tblId", row.get("tblId", ""))
@@ -37,12 +69,25 @@ def main() -> None:
                 row.get("tblId", ""),
                 str(exc),
             )
+            failures.record(key, row, exc)
+            continue
+        if key in attempts:
+            failures.clear(key)
     if out_rows:
         all_df = pd.concat(out_rows, ignore_index=True)
+        if args.retry_failed and os.path.exists(args.out):
+            all_df = pd.concat([pd.read_parquet(args.out), all_df], ignore_index=True)
         all_df.to_parquet(args.out, index=False)
         print(f"[fetch] 총 {len(all_df):,} 행 저장 → {args.out}")
     else:
         print("[fetch] 저장할 데이터가 없습니다.")
+    if not failures.flush():
+        print(f"[fetch][warn] DB 잠금으로 실패 기록 {len(failures):,} 건을 저장하지 못함")
+        return
+    with store.session():
+        remaining = len(store.pending_failures(FAIL_SRC))
+    if remaining:
+        print(f"[fetch] 실패 {remaining:,} 행 기록됨 → --retry-failed 로 재수집")
 
 
 if __name__ == "__main__":
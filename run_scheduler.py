@@ -0,0 +1,40 @@
+"""Long-running refresh daemon: fetch catalog series only when they are due."""
+
+from __future__ import annotations
+
+import argparse
+
+import pandas as pd
+
+from src.config import RATE_SLEEP, SCHED_WORKERS, SNAPSHOT_DIR
+from src.fetcher import fetch_row
+from src.scheduler import run_scheduler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--catalog", default="series_catalog.csv", help="수집용 CSV (run_fetch_data.py와 동일 형식)")
+    parser.add_argument("--workers", type=int, default=SCHED_WORKERS, help="동시 수집 워커 수")
+    parser.add_argument("--rate-sleep", type=float, default=RATE_SLEEP, help="호출 간 최소 간격(초)")
+    parser.add_argument("--poll", type=float, default=60.0, help="대기 중 재확인 주기(초)")
+    parser.add_argument("--once", action="store_true", help="현재 만기된 시리즈만 처리하고 종료")
+    parser.add_argument("--snapshot-dir", default=SNAPSHOT_DIR, help="새 자료 수집 후 스냅샷 내보낼 위치")
+    parser.add_argument("--no-snapshot", action="store_true")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    catalog = pd.read_csv(args.catalog, dtype=str).fillna("")
+    run_scheduler(
+        catalog,
+        fetch_row,
+        workers=args.workers,
+        rate_sleep=args.rate_sleep,
+        once=args.once,
+        poll=args.poll,
+        snapshot_dir=None if args.no_snapshot else args.snapshot_dir,
+        verbose=args.verbose,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -5,14 +5,20 @@ from __future__ import annotations
 import argparse
 import glob
 import json
-from typing import List
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from tqdm import tqdm
 
-from src.normalize import normalize_payload, store_obs
+from src.normalize import frame_to_ipc, normalize_chunk_ipc, normalize_groups
 from src.features import build_wide
-from src import store
+from src import snapshot, store
+from src.config import OBS_BATCH_BYTES, OBS_BATCH_ROWS, RAW_CHUNK_ROWS, SNAPSHOT_DIR, WIDE_DTYPE
 
 
 def _load_json_glob(pattern: str) -> pd.DataFrame:
@@ -28,10 +34,141 @@ def _load_raw(path: str) -> pd.DataFrame:
     if path.endswith(".parquet"):
         return pd.read_parquet(path)
     if path.endswith(".csv"):
-        return pd.read_csv(path)
+        # Codes such as "001" must stay strings; they feed the dims hash.
+        return pd.read_csv(path, dtype=str)
     return _load_json_glob(path)
 
 
+def _iter_parquet(path: str, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    parquet = pq.ParquetFile(path)
+    schema = parquet.schema_arrow
+    index_columns = {c for c in (schema.pandas_metadata or {}).get("index_columns", []) if isinstance(c, str)}
+    columns = [name for name in schema.names if name not in index_columns]
+    # Integer columns with nulls anywhere in the file come out of pd.read_parquet
+    # as float; apply the same to every batch so dims hashes match a full read.
+    meta = parquet.metadata
+    nullable_ints = [
+        field.name
+        for i, field in enumerate(schema)
+        if pa.types.is_integer(field.type)
+        and any(
+            (stats := meta.row_group(g).column(i).statistics) is not None and stats.null_count
+            for g in range(meta.num_row_groups)
+        )
+    ]
+    for batch in parquet.iter_batches(batch_size=chunk_rows, columns=columns):
+        frame = batch.to_pandas()
+        for name in nullable_ints:
+            frame[name] = frame[name].astype("float64")
+        yield frame
+
+
+def _iter_raw(path: str, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Yield the raw harvest in bounded chunks (parquet batches, CSV chunks, one JSON file each)."""
+
+    if path.endswith(".parquet"):
+        yield from _iter_parquet(path, chunk_rows)
+    elif path.endswith(".csv"):
+        yield from pd.read_csv(path, dtype=str, chunksize=chunk_rows)
+    else:
+        yield from _iter_json(glob.glob(path))
+
+
+def _iter_json(files: List[str]) -> Iterator[pd.DataFrame]:
+    """Yield one JSON file at a time, typed as in the concatenated full read.
+
+    Every file gets the union of columns, so a key absent from one file is a
+    null dim there too, and integer columns are widened to float64 wherever
+    ``pd.concat`` would do so (some file lacks the key or holds non-integers),
+    so dims serialise (``1`` vs ``1.0``) and hash the same in both paths.
+    """
+
+    columns: Dict[str, None] = {}
+    kinds: Dict[str, Set[str]] = {}
+    present: Dict[str, int] = {}
+    for file in files:
+        frame = _load_json_glob(file)
+        columns.update(dict.fromkeys(frame.columns))
+        for name, dtype in frame.dtypes.items():
+            kinds.setdefault(name, set()).add(dtype.kind)
+            present[name] = present.get(name, 0) + 1
+    widen = [
+        name
+        for name, found in kinds.items()
+        if found & {"i", "u"} and found <= {"i", "u", "f"} and (present[name] < len(files) or "f" in found)
+    ]
+    for file in files:
+        frame = _load_json_glob(file).reindex(columns=list(columns))
+        for name in widen:
+            if frame[name].dtype.kind in ("i", "u"):
+                frame[name] = frame[name].astype("float64")
+        yield frame
+
+def _normalise_chunks(
+    chunks: Iterable[pd.DataFrame],
+    sink: store.ObsBulkWriter,
+    args: argparse.Namespace,
+    pool: Optional[ProcessPoolExecutor] = None,
+) -> int:
+    """Normalise each chunk per ``(logical_name, prdSe)`` and hand it to ``sink``; return raw rows seen.
+
+    With ``pool`` every chunk is cut into one row slice per worker and
+    shipped as Arrow IPC buffers; each worker groups and normalises its slice
+    and sends one table back, so this process only reads chunks and stays the
+    single writer.  At most ``2 * workers`` slices are in flight.
+    """
+
+    seen = 0
+    skipped: Set[Tuple[str, str]] = set()
+    inflight: Set[Future] = set()
+
+    def _skip(key: Tuple[str, str], exc) -> None:
+        if key not in skipped:
+            skipped.add(key)
+            print(f"[prepare] skip logical_name={key[0]} prdSe={key[1]}: {exc}")
+
+    def _drain(limit: int) -> None:
+        while len(inflight) > limit:
+            done, _ = wait(list(inflight), return_when=FIRST_COMPLETED)
+            for future in done:
+                inflight.discard(future)
+                payload, failed = future.result()
+                for key, exc in failed:
+                    _skip(key, exc)
+                if payload:
+                    sink.add(pa.ipc.open_stream(payload).read_all())
+
+    for raw in chunks:
+        if raw.empty:
+            continue
+        seen += len(raw)
+        if "prdSe" not in raw.columns and args.prdSe:
+            raw["prdSe"] = args.prdSe
+        if "logical_name" not in raw.columns:
+            raw["logical_name"] = args.logical_name
+
+        if pool is not None:
+            try:
+                # Row slices, one per worker: normalisation is row-wise, so a
+                # group split across slices gives the same observations.
+                step = max(1, -(-len(raw) // args.workers))
+                payloads = [frame_to_ipc(raw.iloc[i : i + step]) for i in range(0, len(raw), step)]
+            except pa.ArrowException:
+                pass  # mixed-type object column: normalise in-process below
+            else:
+                for payload in payloads:
+                    inflight.add(pool.submit(normalize_chunk_ipc, payload, frozenset(skipped)))
+                    _drain(2 * args.workers)
+                continue
+        for key, result in normalize_groups(raw, skipped):
+            if isinstance(result, ValueError):
+                _skip(key, result)
+            else:
+                sink.add(result)
+    _drain(0)
+    return seen
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--raw", default="out_data.parquet", help="Harvest output from step 1 (parquet preferred).")
@@ -39,29 +176,47 @@ if __name__ == "__main__":
     parser.add_argument("--logical-name", default="kosis.series", help="Fallback logical_name for unnamed payloads.")
     parser.add_argument("--wide-out", default="out_wide.parquet", help="Destination path for the engineered wide frame.")
     parser.add_argument("--limit", type=int, default=1200, help="Maximum logical series to retain in the wide matrix.")
+    parser.add_argument("--dtype", choices=["float64", "float32"], default=WIDE_DTYPE, help="Storage precision of the wide matrix.")
+    parser.add_argument("--batch-rows", type=int, default=OBS_BATCH_ROWS, help="Flush buffered observations after this many rows.")
+    parser.add_argument("--batch-bytes", type=int, default=OBS_BATCH_BYTES, help="Flush buffered observations after this many bytes.")
+    parser.add_argument("--stream", action="store_true", help="Read and normalise the raw harvest chunk by chunk instead of loading it whole.")
+    parser.add_argument("--chunk-rows", type=int, default=RAW_CHUNK_ROWS, help="Raw rows per chunk in --stream mode.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("KOSIS_PREPARE_WORKERS", "1")),
+        help="Normalise raw chunks in this many worker processes.",
+    )
+    parser.add_argument("--vintage", action="store_true", help="Append to the vintage log (no MERGE) and refresh obs from the new vintages afterwards.")
+    parser.add_argument("--snapshot-dir", default=SNAPSHOT_DIR, help="Export a versioned Parquet snapshot of obs here after ingest.")
+    parser.add_argument("--no-snapshot", action="store_true", help="Skip the post-ingest snapshot export.")
     args = parser.parse_args()
 
     store.init()
-    raw = _load_raw(args.raw)
-    if raw.empty:
+    chunks = tqdm(_iter_raw(args.raw, args.chunk_rows), unit="chunk") if args.stream else [_load_raw(args.raw)]
+    # spawn, not fork: the parent already holds a threaded DuckDB connection.
+    pool = (
+        ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn"))
+        if args.workers > 1
+        else None
+    )
+    try:
+        with store.ObsBulkWriter(batch_rows=args.batch_rows, batch_bytes=args.batch_bytes, vintage=args.vintage) as sink:
+            seen = _normalise_chunks(chunks, sink, args, pool)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    if not seen:
         print("[prepare] No raw records found – skipping normalisation.")
     else:
-        if "prdSe" not in raw.columns and args.prdSe:
-            raw["prdSe"] = args.prdSe
-        if "logical_name" not in raw.columns:
-            raw["logical_name"] = args.logical_name
-
-        groups = raw.groupby(["logical_name", "prdSe"], dropna=False)
-        for (logical_name, prd_se), group in tqdm(groups, total=groups.ngroups):
-            rows = group.to_dict(orient="records")
-            try:
-                df_norm = normalize_payload(str(logical_name), rows, str(prd_se))
-            except ValueError as exc:
-                print(f"[prepare] skip logical_name={logical_name} prdSe={prd_se}: {exc}")
-                continue
-            store_obs(df_norm)
+        print(f"[prepare] {'appended' if args.vintage else 'upserted'} rows={sink.rows_written:,} in {sink.flushes} batch(es)")
+        if args.vintage:
+            refreshed = store.refresh_obs_from_vintages()
+            print(f"[prepare] obs refreshed from new vintages: {refreshed:,} key(s) (compact the log with run_store.py compact)")
+        if not args.no_snapshot:
+            print(f"[prepare] snapshot → {snapshot.export_snapshot(args.snapshot_dir)}")
 
-    wide = build_wide(limit=args.limit)
+    wide = build_wide(limit=args.limit, dtype=args.dtype)
     if wide.empty:
         print("[prepare] No observations available for wide matrix construction.")
     else:
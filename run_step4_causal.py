@@ -20,18 +20,13 @@ from src.causal_models import (
 from src.local_projections import local_projections
 from src.model_select import select_core_vars
 from src.report_causal import render_report
-from src.stationarity import apply_transform, stationarity_report
+from src.stationarity import diagnose
 
 ARTIFACT_DIR = Path("artifacts/step4")
 
 
-def _load_obs() -> pd.DataFrame:
-    connection = store.con()
-    try:
-        frame = connection.execute("SELECT * FROM obs").df()
-    finally:
-        connection.close()
-    return frame
+def _obs_count() -> int:
+    return int(store.reader().execute("SELECT count(*) FROM obs").fetchone()[0])
 
 
 def _irf_to_frame(irf, names) -> Optional[pd.DataFrame]:
@@ -73,15 +68,13 @@ def _save_series(series: Optional[pd.Series], path: Path) -> None:
 
 
 def main() -> None:
-    store.init()
     ARTIFACT_DIR.mkdir(parents=True, exist_ok=True)
 
-    obs = _load_obs()
-    if obs.empty:
+    if not _obs_count():
         print("[step4] obs 테이블이 비어 있습니다. 먼저 준비 단계를 실행하세요.")
         return
 
-    wide = features.build_wide(obs)
+    wide = features.build_wide()
     if wide.empty:
         print("[step4] 피벗된 데이터가 없습니다.")
         return
@@ -95,12 +88,11 @@ def main() -> None:
         return
 
     core_frame = wide[core_vars]
-    transformed, transform_map = apply_transform(core_frame)
+    transformed, transform_map, stationarity_df = diagnose(core_frame)
     if transformed.empty:
         print("[step4] 변환 후 유효한 표본이 없습니다.")
         return
 
-    stationarity_df = stationarity_report(core_frame, transformed, transform_map)
     stationarity_path = ARTIFACT_DIR / "stationarity.csv"
     stationarity_df.to_csv(stationarity_path, index=False)
     with (ARTIFACT_DIR / "transform_map.json").open("w", encoding="utf-8") as handle:
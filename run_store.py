@@ -0,0 +1,39 @@
+"""Maintenance commands for the DuckDB observation store."""
+
+from __future__ import annotations
+
+import argparse
+
+from src import snapshot, store
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("compact", help="Drop unrevised vintages and refresh obs with the latest values.")
+    sub.add_parser("cluster", help="Rewrite obs in (series_id, period) order.")
+    show = sub.add_parser("stats", help="Show per-series statistics, stalest first.")
+    show.add_argument("--refresh", action="store_true", help="Recompute series_stats from obs first.")
+    show.add_argument("--limit", type=int, default=20)
+    snap = sub.add_parser("snapshot", help="Export obs/series to a versioned Parquet snapshot.")
+    snap.add_argument("--dir", default=snapshot.SNAPSHOT_DIR)
+    snap.add_argument("--keep", type=int, default=snapshot.SNAPSHOT_KEEP)
+    args = parser.parse_args()
+
+    store.init()
+    if args.command == "compact":
+        stats = store.compact_vintages()
+        print(f"[store] vintage log {stats['rows_before']:,} → {stats['rows_after']:,} rows")
+    elif args.command == "cluster":
+        store.cluster_obs()
+        print("[store] obs re-clustered by (series_id, period)")
+    elif args.command == "stats":
+        if args.refresh:
+            store.refresh_series_stats()
+        print(store.load_series_stats("database").head(args.limit).to_string(index=False))
+    elif args.command == "snapshot":
+        print(f"[store] snapshot → {snapshot.export_snapshot(args.dir, keep=args.keep)}")
+
+
+if __name__ == "__main__":
+    main()
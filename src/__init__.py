@@ -13,8 +13,11 @@ from . import (
     report,
     report_causal,
     scenario,
+    scheduler,
+    snapshot,
     stationarity,
     store,
+    unitroot,
 )
 
 __all__ = [
@@ -30,6 +33,9 @@ __all__ = [
     "report",
     "report_causal",
     "scenario",
+    "scheduler",
+    "snapshot",
     "stationarity",
     "store",
+    "unitroot",
 ]
@@ -13,7 +13,7 @@ from statsmodels.tsa.vector_ar.svar_model import SVAR
 def fit_var(df: pd.DataFrame, maxlags: int = 4, ic: str = "aic"):
     """Fit a VAR model using information-criterion lag selection."""
 
-    data = df.dropna()
+    data = df.dropna().astype("float64")
     if data.empty or data.shape[0] <= maxlags + 1:
         return None
 
@@ -65,7 +65,7 @@ def irf_from_result(result, periods: int = 8):
 def fit_dfm(df: pd.DataFrame, k_factors: int = 1, factor_order: int = 1):
     """Fit a dynamic factor model."""
 
-    data = df.dropna()
+    data = df.dropna().astype("float64")
     if data.empty:
         return None
 
@@ -84,7 +84,7 @@ def fit_dfm(df: pd.DataFrame, k_factors: int = 1, factor_order: int = 1):
 def rolling_forecast_var(df: pd.DataFrame, lags: int, test_size: int = 8) -> Dict[str, Any]:
     """Produce a simple rolling-origin forecast evaluation for a VAR model."""
 
-    data = df.dropna()
+    data = df.dropna().astype("float64")
     if data.empty or data.shape[0] <= lags + test_size:
         return {}
 
@@ -13,6 +13,32 @@ except Exception:
 # -------- 환경변수 --------
 KOSIS_API_KEY = os.getenv("KOSIS_API_KEY", "")
 DB_PATH       = os.getenv("KOSIS_DB", "kosis.duckdb")
+DB_THREADS      = os.getenv("KOSIS_DB_THREADS", "")       # DuckDB threads (빈 값 → 기본값)
+DB_MEMORY_LIMIT = os.getenv("KOSIS_DB_MEMORY_LIMIT", "")  # 예: "4GB"
+# obs 일괄 적재: 아래 행 수 또는 바이트를 넘으면 한 번에 MERGE
+OBS_BATCH_ROWS  = int(os.getenv("KOSIS_OBS_BATCH_ROWS", "500000"))
+OBS_BATCH_BYTES = int(os.getenv("KOSIS_OBS_BATCH_BYTES", str(256 * 1024 * 1024)))
+# step 2 --stream: 원자료를 이 행 수 단위(parquet 배치/CSV 청크)로 읽어 정규화
+RAW_CHUNK_ROWS  = int(os.getenv("KOSIS_RAW_CHUNK_ROWS", "200000"))
+# 분석 단계용 읽기 전용 스냅샷(Parquet) 위치와 보존 개수
+SNAPSHOT_DIR    = os.getenv("KOSIS_SNAPSHOT_DIR", "snapshots")
+SNAPSHOT_KEEP   = int(os.getenv("KOSIS_SNAPSHOT_KEEP", "3"))
+# 분석 단계 읽기 경로: auto(최신 스냅샷이 DB와 같거나 수집 중이라 DB가 잠겨 있으면 스냅샷, 아니면 DB)
+#                   | database(DB 읽기 전용) | snapshot(최신 스냅샷)
+READ_SOURCE     = os.getenv("KOSIS_READ_SOURCE", "auto")
+# 파생 캐시(wide/정상성) 보관 위치: 기본은 DB 파일과 같은 폴더의 cache/ (실행 위치와 무관)
+CACHE_DIR       = os.getenv("KOSIS_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(DB_PATH)), "cache"))
+# build_wide 증분 캐시(열별 지문 + 파생열). 빈 값이면 매번 전체 재계산
+WIDE_CACHE      = os.getenv("KOSIS_WIDE_CACHE", os.path.join(CACHE_DIR, "wide.parquet"))
+# wide 행렬 저장 정밀도(float64 | float32)와 단계별 열 청크 크기
+WIDE_DTYPE      = os.getenv("KOSIS_WIDE_DTYPE", "float64")
+WIDE_CHUNK_COLS = int(os.getenv("KOSIS_WIDE_CHUNK_COLS", "256"))
+# 정상성 검정(ADF/KPSS)을 열 단위로 나눠 돌릴 프로세스 수 (1 → 직렬)
+STATIONARITY_WORKERS = int(os.getenv("KOSIS_STATIONARITY_WORKERS", "1"))
+# 정상성 검정 엔진: statsmodels(열별) | numpy(여러 계열 일괄) | validate(둘 다 돌려 차이 경고)
+STATIONARITY_ENGINE  = os.getenv("KOSIS_STATIONARITY_ENGINE", "statsmodels")
+# 정상성 검정 결과 캐시(계열 값 + 검정 설정 해시 → p-값/변환). 빈 값이면 캐시 안 함
+STATIONARITY_CACHE   = os.getenv("KOSIS_STATIONARITY_CACHE", os.path.join(CACHE_DIR, "stationarity.parquet"))
 
 # -------- 호출 설정 --------
 TIMEOUT     = 20
@@ -24,3 +50,9 @@ URL_LIST  = "https://kosis.kr/openapi/statisticsList.do"                  # 목
 URL_DATA  = "https://kosis.kr/openapi/statisticsData.do"                  # 자료(등록형)
 URL_PARAM = "https://kosis.kr/openapi/Param/statisticsParameterData.do"   # 자료(통계표선택형)
 URL_META  = "https://kosis.kr/openapi/statisticsData.do"                  # 메타(type=TBL)
+
+# -------- 갱신 스케줄러 --------
+# 주기 종료 후 공표까지 예상 지연(일)과, 공표 예정일이 지났는데 새 자료가 없을 때 재확인 간격(일)
+RELEASE_LAG_DAYS = {"M": 30, "Q": 60, "S": 90, "Y": 120}
+RECHECK_DAYS     = {"M": 2, "Q": 5, "S": 7, "Y": 14, "D": 1, "F": 7, "IR": 7}
+SCHED_WORKERS    = int(os.getenv("KOSIS_SCHED_WORKERS", "4"))
@@ -36,16 +36,76 @@ def _mi(a: np.ndarray, b: np.ndarray) -> float:
     return float(score[0])
 
 
-def _rolling_consistency(df: pd.DataFrame, window: int = 20, threshold: float = 0.3) -> pd.DataFrame:
+def _window_hits(a: np.ndarray, b: np.ndarray, window: int, threshold: float) -> np.ndarray:
+    """Count the windows in which ``|corr(a_i, b_j)| >= threshold``, sliding one row at a time."""
+
+    n_rows = a.shape[0]
+    head_a, head_b = a[:window], b[:window]
+    sum_a, sum_b = head_a.sum(axis=0), head_b.sum(axis=0)
+    sq_a, sq_b = (head_a**2).sum(axis=0), (head_b**2).sum(axis=0)
+    cross = head_a.T @ head_b
+    hits = np.zeros(cross.shape, dtype=np.int64)
+    cov, limit = np.empty_like(cross), np.empty_like(cross)
+    hit = np.empty(cross.shape, dtype=bool)
+    thr2 = threshold * threshold
+    # A window whose centred sum of squares is (numerically) zero has no
+    # correlation, as in DataFrame.corr, and never counts as a hit.
+    tol = 1e-10 * window
+    for end in range(window, n_rows + 1):
+        if end > window:
+            new, old = end - 1, end - 1 - window
+            sum_a += a[new] - a[old]
+            sum_b += b[new] - b[old]
+            sq_a += a[new] ** 2 - a[old] ** 2
+            sq_b += b[new] ** 2 - b[old] ** 2
+            cross += np.multiply.outer(a[new], b[new], out=cov)
+            cross -= np.multiply.outer(a[old], b[old], out=cov)
+        var_a = sq_a - sum_a**2 / window
+        var_b = sq_b - sum_b**2 / window
+        var_a[var_a <= tol] = np.inf
+        var_b[var_b <= tol] = np.inf
+        # |corr| >= thr  <=>  cov^2 >= thr^2 var_a var_b  (no sqrt or division per pair)
+        np.multiply.outer(sum_a / window, sum_b, out=cov)
+        np.subtract(cross, cov, out=cov)
+        np.multiply(cov, cov, out=cov)
+        np.multiply.outer(thr2 * var_a, var_b, out=limit)
+        np.greater_equal(cov, limit, out=hit)
+        hits += hit
+    return hits
+
+
+def _rolling_consistency(
+    df: pd.DataFrame, window: int = 20, threshold: float = 0.3, block: int | None = 256
+) -> pd.DataFrame:
+    """Share of rolling windows in which each pair's ``|corr|`` reaches ``threshold``.
+
+    Running sums of x, x² and xy are updated as the window slides (one row
+    in, one row out), so each step costs O(N²) and no per-window frames are
+    built; hits are counted into one preallocated array.  ``block`` limits
+    the working set to ``block × block`` column pairs at a time, which also
+    keeps it cache-resident (``None``: all columns at once).  ``df`` must
+    be complete, as in :func:`discover_all`.
+    """
+
     cols = df.columns
-    hits = pd.DataFrame(0.0, index=cols, columns=cols)
-    total = 0
-    for end in range(window, len(df) + 1):
-        subset = df.iloc[end - window : end]
-        corr = subset.corr().abs()
-        hits = hits.add((corr >= threshold).astype(float), fill_value=0.0)
-        total += 1
-    return hits / total if total else hits
+    values = df.to_numpy(dtype=float)
+    total = len(values) - window + 1
+    if total <= 0:
+        return pd.DataFrame(0.0, index=cols, columns=cols)
+    # Correlation ignores per-column shifts and scales; standardising keeps
+    # the running sums well conditioned.
+    scale = values.std(axis=0)
+    values = (values - values.mean(axis=0)) / np.where(scale > 0, scale, 1.0)
+
+    n = values.shape[1]
+    size = block or n
+    hits = np.zeros((n, n), dtype=np.int64)
+    for i in range(0, n, size):
+        for j in range(i, n, size):
+            part = _window_hits(values[:, i : i + size], values[:, j : j + size], window, threshold)
+            hits[i : i + size, j : j + size] = part
+            hits[j : j + size, i : i + size] = part.T
+    return pd.DataFrame(hits / total, index=cols, columns=cols)
 
 
 def _granger(df: pd.DataFrame, maxlag: int = 4) -> Tuple[pd.DataFrame, pd.DataFrame]:
@@ -2,27 +2,164 @@
 
 from __future__ import annotations
 
+import json
+import os
+import tempfile
+from typing import NamedTuple
+
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 
-from .store import con
+from .config import WIDE_CACHE, WIDE_CHUNK_COLS, WIDE_DTYPE
+from .store import reader
 from .qc import basic_qc
+from .snapshot import open_snapshot
 
 
-def load_obs(limit: int = 1200) -> pd.DataFrame:
-    """Load the longest logical series from the obs table."""
+def _obs_source(
+    *, start: str | None, end: str | None, prefix: str | None, as_of: str | None
+) -> tuple[str, list]:
+    """Return the filtered ``(logical_name, series_id, period, value)`` query and its parameters."""
 
-    connection = con()
-    try:
-        df = connection.execute("SELECT series_key, period, value FROM obs").df()
-    finally:
-        connection.close()
-    if df.empty:
-        return df
-    df["logical_name"] = df["series_key"].str.split("|").str[0]
-    lengths = df.groupby("logical_name")["period"].nunique().sort_values(ascending=False)
-    keep = lengths.head(limit).index
-    return df[df["logical_name"].isin(keep)]
+    source = "obs"
+    params: list = []
+    if as_of:
+        source = (
+            "(SELECT series_id, period, arg_max(value, vintage_ts) AS value FROM obs_vintage "
+            "WHERE vintage_ts <= CAST(? AS TIMESTAMP) GROUP BY series_id, period)"
+        )
+        params.append(as_of)
+    clauses = []
+    if start:
+        clauses.append("o.period >= CAST(? AS DATE)")
+        params.append(start)
+    if end:
+        clauses.append("o.period <= CAST(? AS DATE)")
+        params.append(end)
+    if prefix:
+        clauses.append("starts_with(s.logical_name, ?)")
+        params.append(prefix)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    sql = (
+        "SELECT s.logical_name, o.series_id, o.period, o.value "
+        f"FROM {source} o JOIN series s USING (series_id) {where}"
+    )
+    return sql, params
+
+
+def _top_names_sql(src: str) -> str:
+    return (
+        f"SELECT logical_name FROM ({src}) GROUP BY logical_name "
+        "ORDER BY count(DISTINCT period) DESC, logical_name LIMIT ?"
+    )
+
+
+# Top-N logical names of the whole store ranked from ``name_stats`` (distinct
+# periods per name, kept current at ingest) instead of a scan of ``obs``.  The
+# fingerprint is the name's row count and XOR of row hashes.
+_STATS_TOP_SQL = """
+SELECT logical_name, n_obs || ':' || checksum AS fingerprint
+FROM name_stats
+ORDER BY n_periods DESC, logical_name LIMIT ?
+"""
+
+
+def _query(sql: str, params: list, *, as_of: str | None, snapshot: str | None, frame: bool = False):
+    """Run ``sql`` on a snapshot connection or :func:`src.store.reader`."""
+
+    if snapshot:
+        if as_of:
+            raise ValueError("as_of reads the vintage log and needs the database, not a snapshot")
+        connection = open_snapshot(snapshot)
+        try:
+            result = connection.execute(sql, params)
+            return result.df() if frame else result.fetchall()
+        finally:
+            connection.close()
+    result = reader("database" if as_of else None).execute(sql, params)
+    return result.df() if frame else result.fetchall()
+
+
+def load_obs(
+    limit: int = 1200,
+    *,
+    start: str | None = None,
+    end: str | None = None,
+    prefix: str | None = None,
+    as_of: str | None = None,
+    snapshot: str | None = None,
+) -> pd.DataFrame:
+    """Load the observations of the ``limit`` longest logical series.
+
+    ``start``/``end`` (ISO dates) and ``prefix`` (a logical-name domain such
+    as ``"macro."``) are pushed into the query so DuckDB can prune row groups
+    on the clustered ``(series_id, period)`` layout, and the top-N ranking by
+    distinct periods runs in DuckDB as well (from ``name_stats`` when
+    unfiltered).  ``as_of`` reads the values
+    known at that timestamp from the vintage log instead of ``obs`` (this
+    needs the database; snapshots hold latest values only).  ``snapshot``
+    queries an exported Parquet snapshot directory (see :mod:`src.snapshot`);
+    otherwise the query runs on :func:`src.store.reader`, so analysis never
+    takes the writer lock.
+    """
+
+    src, params = _obs_source(start=start, end=end, prefix=prefix, as_of=as_of)
+    if start or end or prefix or as_of:
+        top = _top_names_sql("SELECT * FROM src")
+    else:
+        top = f"SELECT logical_name FROM ({_STATS_TOP_SQL})"
+    sql = f"WITH src AS ({src}), top AS ({top}) SELECT src.* FROM src SEMI JOIN top USING (logical_name)"
+    return _query(sql, params + [limit], as_of=as_of, snapshot=snapshot, frame=True)
+
+
+_SQL_TYPES = {"float64": "DOUBLE", "float32": "FLOAT"}
+
+
+def _pivot(src: str, params: list, names: list[str], dtype: str = "float64", **source) -> pd.DataFrame:
+    """``PIVOT`` ``src`` into a period × name matrix (mean per cell, not interpolated).
+
+    Cells are cast to ``dtype`` inside DuckDB, so a float32 matrix never
+    exists as float64 in pandas.
+    """
+
+    labels = ", ".join("'" + name.replace("'", "''") + "'" for name in names)
+    wide = _query(
+        f"PIVOT ({src}) ON logical_name IN ({labels}) "
+        f"USING CAST(avg(value) AS {_SQL_TYPES[dtype]}) GROUP BY period ORDER BY period",
+        params,
+        frame=True,
+        **source,
+    )
+    wide = wide.set_index("period")[sorted(names)]
+    wide.columns.name = "logical_name"
+    return wide
+
+
+def load_wide(
+    limit: int = 1200,
+    *,
+    start: str | None = None,
+    end: str | None = None,
+    prefix: str | None = None,
+    as_of: str | None = None,
+    snapshot: str | None = None,
+) -> pd.DataFrame:
+    """Build the period × logical_name matrix of :func:`pivot_wide` inside DuckDB.
+
+    The top-N names are selected first, then a ``PIVOT`` over exactly those
+    names averages each period's values, so only the wide matrix reaches
+    pandas.  Arguments as in :func:`load_obs`.
+    """
+
+    src, params = _obs_source(start=start, end=end, prefix=prefix, as_of=as_of)
+    top = _top_names_sql(src) if start or end or prefix or as_of else _STATS_TOP_SQL
+    names = [row[0] for row in _query(top, params + [limit], as_of=as_of, snapshot=snapshot)]
+    if not names:
+        return pd.DataFrame()
+    wide = _pivot(src, params, names, as_of=as_of, snapshot=snapshot)
+    return wide.interpolate(limit_direction="both")
 
 
 def pivot_wide(df_obs: pd.DataFrame) -> pd.DataFrame:
@@ -37,44 +174,399 @@ def pivot_wide(df_obs: pd.DataFrame) -> pd.DataFrame:
     return wide.interpolate(limit_direction="both")
 
 
+# Native block frequencies and their length in months; D/F/IR series are irregular
+# and stay out of the block builders.
+FREQ_MONTHS = {"M": 1, "Q": 3, "S": 6, "Y": 12}
+
+
+def _month_ends(start: pd.Timestamp, end: pd.Timestamp, freq: str) -> pd.DatetimeIndex:
+    return pd.date_range(start, end, freq=f"{FREQ_MONTHS[freq]}ME", name="period")
+
+
+def _bucket_ends(buckets: np.ndarray, freq: str) -> pd.DatetimeIndex:
+    """Anchor (last day) of each ``freq`` bucket numbered ``months // FREQ_MONTHS[freq]``."""
+
+    last = np.asarray(buckets) * FREQ_MONTHS[freq] + FREQ_MONTHS[freq] - 1
+    starts = pd.to_datetime({"year": last // 12, "month": last % 12 + 1, "day": 1})
+    return pd.DatetimeIndex(starts + pd.offsets.MonthEnd(0), name="period")
+
+
+def _months(index: pd.DatetimeIndex) -> np.ndarray:
+    return np.asarray(index.year * 12 + index.month - 1)
+
+
+def load_blocks(
+    limit: int = 1200,
+    *,
+    freqs: tuple[str, ...] = tuple(FREQ_MONTHS),
+    start: str | None = None,
+    end: str | None = None,
+    prefix: str | None = None,
+    as_of: str | None = None,
+    snapshot: str | None = None,
+) -> dict[str, pd.DataFrame]:
+    """Return one dense period × logical_name block per native frequency.
+
+    Unlike :func:`load_wide`, series are not forced onto a shared index and
+    nothing is interpolated: each block is indexed by every period end of its
+    own frequency between its first and last observation, with NaN where a
+    series has no value.  ``limit`` applies per block; the other arguments
+    are as in :func:`load_obs`.  Use :func:`convert_block` or
+    :func:`align_blocks` to move between frequencies.
+    """
+
+    src, params = _obs_source(start=start, end=end, prefix=prefix, as_of=as_of)
+    blocks: dict[str, pd.DataFrame] = {}
+    for freq in freqs:
+        if freq not in FREQ_MONTHS:
+            raise ValueError(f"freq must be one of {sorted(FREQ_MONTHS)}: {freq}")
+        sub = f"SELECT o.* FROM ({src}) o JOIN series f USING (series_id) WHERE f.freq = ?"
+        rows = _query(_top_names_sql(sub), params + [freq, limit], as_of=as_of, snapshot=snapshot)
+        names = [row[0] for row in rows]
+        if not names:
+            continue
+        block = _pivot(sub, params + [freq], names, as_of=as_of, snapshot=snapshot)
+        block.index = pd.DatetimeIndex(block.index)
+        blocks[freq] = block.reindex(_month_ends(block.index.min(), block.index.max(), freq))
+    return blocks
+
+
+def convert_block(block: pd.DataFrame, source: str, target: str, how: str | None = None) -> pd.DataFrame:
+    """Re-express a native ``source`` block at the ``target`` frequency.
+
+    Aggregating to a coarser frequency groups whole periods and applies
+    ``how`` (any pandas reduction, default ``"mean"``; e.g. ``"last"`` for
+    stocks, ``"sum"`` for flows) to buckets with a value for every
+    sub-period; partial edge buckets and buckets with gaps are NaN rather
+    than reported as complete.  Disaggregating to a finer frequency
+    either repeats each value over its sub-periods (``"step"``, default) or
+    interpolates linearly between period ends (``"linear"``).
+    """
+
+    if source == target:
+        return block.copy()
+    months = _months(block.index)
+    if FREQ_MONTHS[target] > FREQ_MONTHS[source]:
+        buckets = months // FREQ_MONTHS[target]
+        grouped = block.groupby(buckets)
+        out = grouped.agg(how or "mean").where(grouped.count() == FREQ_MONTHS[target] // FREQ_MONTHS[source])
+        out.index = _bucket_ends(out.index.to_numpy(), target)
+        return out
+
+    first_month = months.min() // FREQ_MONTHS[source] * FREQ_MONTHS[source]
+    first = _bucket_ends(np.array([first_month // FREQ_MONTHS[target]]), target)[0]
+    fine = block.reindex(_month_ends(first, block.index.max(), target))
+    how = how or "step"
+    if how == "step":
+        return fine.groupby(_months(fine.index) // FREQ_MONTHS[source]).bfill()
+    if how == "linear":
+        return fine.interpolate(limit_area="inside")
+    raise ValueError(f"how must be 'step' or 'linear' when disaggregating: {how}")
+
+
+def align_blocks(
+    blocks: dict[str, pd.DataFrame], target: str, *, agg: str = "mean", disagg: str = "step"
+) -> pd.DataFrame:
+    """Convert every block to ``target`` and join them on the period index.
+
+    A logical name present at several frequencies keeps its native-``target``
+    column, else the first block's.
+    """
+
+    order = sorted(blocks, key=lambda freq: (freq != target, FREQ_MONTHS[freq]))
+    frames = [
+        convert_block(blocks[freq], freq, target, agg if FREQ_MONTHS[target] > FREQ_MONTHS[freq] else disagg)
+        for freq in order
+    ]
+    if not frames:
+        return pd.DataFrame()
+    out = pd.concat(frames, axis=1).sort_index()
+    return out.loc[:, ~out.columns.duplicated()]
+
+
+class FeatureSpec(NamedTuple):
+    """One family of derived features.
+
+    ``pct_change`` specs apply to every column defined before them (base
+    columns plus earlier derived ones) and name each output by formatting
+    ``name`` with ``col``; they are skipped below ``min_rows`` periods.
+    ``spread`` (a - b) and ``ratio`` (a / b, zero denominators → NaN) take
+    the first column containing a keyword of ``inputs[0]`` and of
+    ``inputs[1]``, keywords tried in order, case-insensitively.
+    """
+
+    name: str
+    kind: str
+    inputs: tuple = ()
+    lag: int = 1
+    min_rows: int = 0
+
+
+# Derived features of the wide matrix, evaluated in this order.
+FEATURE_SPECS: tuple[FeatureSpec, ...] = (
+    FeatureSpec("{col}__yoy", "pct_change", lag=12, min_rows=13),
+    FeatureSpec("{col}__q4", "pct_change", lag=4, min_rows=5),
+    FeatureSpec("rates__term_spread", "spread", (("long", "10y"), ("short", "3m"))),
+    FeatureSpec("bank__loan_to_deposit", "ratio", (("loan",), ("deposit",))),
+)
+_GROWTH_SPECS = tuple(spec for spec in FEATURE_SPECS if spec.kind == "pct_change")
+_CROSS_SPECS = tuple(spec for spec in FEATURE_SPECS if spec.kind != "pct_change")
+
+
+def _ffill(values: np.ndarray) -> np.ndarray:
+    """Forward-fill NaNs down each column (``pct_change``'s default padding)."""
+
+    rows = np.where(np.isnan(values), 0, np.arange(len(values))[:, None])
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    return np.take_along_axis(values, rows, axis=0)
+
+
+class FeaturePlan:
+    """A feature registry compiled against one column index.
+
+    Compiling resolves every spec to integer source/destination positions
+    once; :meth:`evaluate` then fills a single preallocated array in one pass
+    over the ops, computing only what the requested outputs depend on.
+    Nothing is computed until asked for, so callers can keep just the base
+    matrix and materialise derived columns lazily.
+    """
+
+    def __init__(self, columns, specs: tuple[FeatureSpec, ...] = FEATURE_SPECS, length: int | None = None) -> None:
+        self.base = [str(c) for c in columns]
+        self.columns = list(self.base)
+        self.ops: list[tuple[str, np.ndarray, np.ndarray, int]] = []
+        for spec in specs:
+            if spec.kind == "pct_change":
+                if length is not None and length < spec.min_rows:
+                    continue
+                src = np.arange(len(self.columns))
+                names = [spec.name.format(col=col) for col in self.columns]
+            elif spec.kind in ("spread", "ratio"):
+                picks = [self._first(keywords) for keywords in spec.inputs]
+                if any(pick is None for pick in picks):
+                    continue
+                src, names = np.array(picks), [spec.name]
+            else:
+                raise ValueError(f"unknown feature kind: {spec.kind}")
+            dst = np.arange(len(self.columns), len(self.columns) + len(names))
+            self.columns.extend(names)
+            self.ops.append((spec.kind, src, dst, spec.lag))
+
+    def _first(self, keywords) -> int | None:
+        lowered = [col.lower() for col in self.columns]
+        for keyword in keywords:
+            keyword = keyword.lower()
+            pos = next((pos for pos, col in enumerate(lowered) if keyword in col), None)
+            if pos is not None:
+                return pos
+        return None
+
+    @property
+    def derived(self) -> list[str]:
+        return self.columns[len(self.base):]
+
+    def evaluate(
+        self, values: np.ndarray | pd.DataFrame, outputs: list[str] | None = None, dtype: str = "float64"
+    ) -> np.ndarray:
+        """Return ``outputs`` (default: every column) computed from base ``values``.
+
+        Only the base columns the outputs depend on are read from ``values``;
+        the work array (and result) is allocated as ``dtype``.
+        """
+
+        if outputs is None:
+            wanted = list(range(len(self.columns)))
+            needed = set(wanted)
+        else:
+            position = {name: pos for pos, name in reversed(list(enumerate(self.columns)))}
+            wanted = [position[name] for name in outputs]
+            needed = set(wanted)
+            for _, src, dst, _ in reversed(self.ops):
+                if needed.intersection(dst.tolist()):
+                    needed.update(src.tolist())
+        slots = {pos: slot for slot, pos in enumerate(sorted(needed))}
+        out = np.empty((len(values), len(slots)), dtype=dtype)
+        base = [pos for pos in slots if pos < len(self.base)]
+        if isinstance(values, pd.DataFrame):
+            out[:, [slots[pos] for pos in base]] = values.iloc[:, base].to_numpy(dtype=dtype)
+        else:
+            out[:, [slots[pos] for pos in base]] = values[:, base]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for kind, src, dst, lag in self.ops:
+                keep = [i for i, pos in enumerate(dst.tolist()) if pos in slots]
+                if not keep:
+                    continue
+                targets = [slots[pos] for pos in dst[keep].tolist()]
+                if kind == "pct_change":
+                    data = _ffill(out[:, [slots[pos] for pos in src[keep].tolist()]])
+                    result = np.full_like(data, np.nan)
+                    result[lag:] = data[lag:] / data[:-lag] - 1
+                    out[:, targets] = result
+                elif kind == "spread":
+                    out[:, targets[0]] = out[:, slots[src[0]]] - out[:, slots[src[1]]]
+                else:
+                    denom = out[:, slots[src[1]]]
+                    out[:, targets[0]] = out[:, slots[src[0]]] / np.where(denom == 0, np.nan, denom)
+        return out[:, [slots[pos] for pos in wanted]]
+
+    def frame(self, wide: pd.DataFrame, outputs: list[str] | None = None, dtype: str = "float64") -> pd.DataFrame:
+        names = list(outputs) if outputs is not None else self.columns
+        return pd.DataFrame(self.evaluate(wide, names, dtype), index=wide.index, columns=names)
+
+
+def compile_features(
+    columns, specs: tuple[FeatureSpec, ...] = FEATURE_SPECS, length: int | None = None
+) -> FeaturePlan:
+    """Compile ``specs`` against ``columns`` (``length`` rows; default: every spec applies)."""
+
+    return FeaturePlan(columns, specs, length)
+
+
+def _growth(wide: pd.DataFrame, dtype: str = "float64") -> pd.DataFrame:
+    """Return the per-column growth derivatives of :func:`add_derivatives`.
+
+    Growth of growth divides by values near zero, so each column chunk is
+    evaluated in float64 and only stored as ``dtype``.
+    """
+
+    length = len(wide)
+    blocks = []
+    for block in iter_column_chunks(wide):
+        plan = compile_features(block.columns, _GROWTH_SPECS, length)
+        blocks.append(plan.frame(block, plan.derived).astype(dtype, copy=False))
+    names = compile_features(wide.columns, _GROWTH_SPECS, length).derived
+    if not blocks:
+        return pd.DataFrame(index=wide.index, columns=names, dtype=dtype)
+    return pd.concat(blocks, axis=1)[names]
+
+
+def _cross(out: pd.DataFrame, dtype: str = "float64") -> pd.DataFrame:
+    """Append the cross-column spread and ratio indicators of :func:`add_derivatives`."""
+
+    plan = compile_features(out.columns, _CROSS_SPECS)
+    if not plan.derived:
+        return out
+    return pd.concat([out, plan.frame(out, plan.derived, dtype)], axis=1)
+
+
 def add_derivatives(wide: pd.DataFrame) -> pd.DataFrame:
-    """Append derivative indicators such as YoY growth, spreads, and ratios."""
-
-    out = wide.copy()
-    if len(out) > 12:
-        yoy = out.pct_change(12)
-        yoy.columns = [f"{col}__yoy" for col in out.columns]
-        out = pd.concat([out, yoy], axis=1)
-    if len(out) > 4:
-        qoq4 = out.pct_change(4)
-        qoq4.columns = [f"{col}__q4" for col in out.columns]
-        out = pd.concat([out, qoq4], axis=1)
-
-    def _maybe(name: str) -> list[str]:
-        lower = name.lower()
-        return [col for col in out.columns if lower in col.lower()]
-
-    short = _maybe("short") + _maybe("3m")
-    long = _maybe("long") + _maybe("10y")
-    if short and long:
-        out["rates__term_spread"] = out[long[0]] - out[short[0]]
-
-    loans = _maybe("loan")
-    deposits = _maybe("deposit")
-    if loans and deposits:
-        denom = out[deposits[0]].replace(0, np.nan)
-        out["bank__loan_to_deposit"] = out[loans[0]] / denom
-    return out
-
-
-def build_wide(limit: int = 1200) -> pd.DataFrame:
-    """Construct a QC-ed wide matrix with engineered derivative features."""
-
-    obs = load_obs(limit=limit)
-    wide = pivot_wide(obs)
-    if wide.empty:
-        return wide
-    wide = basic_qc(wide, min_len=24)
-    wide = add_derivatives(wide)
-    wide = wide.loc[:, wide.notna().sum() > 0]
-    return wide
+    """Append derivative indicators such as YoY growth, spreads, and ratios.
+
+    Every :data:`FEATURE_SPECS` output is materialised; use
+    :func:`compile_features` to evaluate only the columns a stage needs.
+    """
+
+    return compile_features(wide.columns, length=len(wide)).frame(wide)
+
+
+def _read_wide_cache(path: str, dtype: str | None = None) -> tuple[pd.DataFrame, dict] | None:
+    """Return the cached ``(raw pivot, fingerprints)``, or ``None`` if absent, unreadable or another dtype."""
+
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        table = pq.read_table(path)
+        meta = json.loads((table.schema.metadata or {}).get(_CACHE_KEY, b"{}"))
+        if dtype is not None and meta.get("dtype", "float64") != dtype:
+            return None
+        raw = table.to_pandas()
+    except (OSError, ValueError, pa.ArrowException):
+        # A truncated or foreign file is a cache miss; the rebuild overwrites it.
+        return None
+    raw.columns.name = "logical_name"
+    return raw, meta.get("fingerprints", {})
+
+
+def _write_wide_cache(path: str, raw: pd.DataFrame, fingerprints: dict, dtype: str = "float64") -> None:
+    frame = raw.copy(deep=False)
+    frame.columns.name = None
+    table = pa.Table.from_pandas(frame, preserve_index=True)
+    meta = dict(table.schema.metadata or {})
+    meta[_CACHE_KEY] = json.dumps({"fingerprints": fingerprints, "dtype": dtype}).encode("utf-8")
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    # A private temp file per writer: concurrent builds never write into the
+    # same file, and the last os.replace wins with a complete cache.
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        pq.write_table(table.replace_schema_metadata(meta), tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+_CACHE_KEY = b"kosis.wide_cache"
+
+
+def _cached_pivot(limit: int, cache_path: str | None, dtype: str = "float64") -> pd.DataFrame:
+    """Return the raw ``dtype`` pivot of the top ``limit`` names, reusing ``cache_path``.
+
+    Each logical series is fingerprinted from ``name_stats`` (row count and
+    an XOR of row hashes, kept current at ingest).  Only series whose
+    fingerprint changed are pivoted again; unchanged columns come from the
+    cached pivot.  Derived features are not cached: they are computed after
+    QC for the surviving columns only.
+    """
+
+    src, params = _obs_source(start=None, end=None, prefix=None, as_of=None)
+    rows = _query(_STATS_TOP_SQL, params + [limit], as_of=None, snapshot=None)
+    fingerprints = dict(rows)
+    names = sorted(fingerprints)
+    if not names:
+        return pd.DataFrame()
+
+    cached = _read_wide_cache(cache_path, dtype) if cache_path else None
+    old_raw, old_fps = cached if cached else (pd.DataFrame(), {})
+    kept = [n for n in names if old_fps.get(n) == fingerprints[n] and n in old_raw.columns]
+    stale = [n for n in names if n not in kept]
+    fresh = _pivot(src, params, stale, dtype, as_of=None, snapshot=None) if stale else pd.DataFrame(dtype=dtype)
+
+    index = old_raw.index[old_raw[kept].notna().any(axis=1)] if kept else fresh.index
+    if kept and stale:
+        index = index.union(fresh.index)
+    raw = pd.concat([old_raw[kept].reindex(index), fresh.reindex(index)], axis=1)[names]
+    raw.index.name = "period"
+    raw.columns.name = "logical_name"
+
+    if cache_path and fingerprints != old_fps:
+        _write_wide_cache(cache_path, raw, fingerprints, dtype)
+    return raw
+
+
+def iter_column_chunks(wide: pd.DataFrame, size: int = WIDE_CHUNK_COLS, dtype: str | None = None):
+    """Yield ``wide`` in blocks of at most ``size`` columns, cast to ``dtype`` if given.
+
+    Lets stages scan a compact float32 matrix while upcasting only the block
+    currently being worked on.
+    """
+
+    size = max(1, int(size))
+    for start in range(0, wide.shape[1], size):
+        block = wide.iloc[:, start : start + size]
+        yield block.astype(dtype) if dtype else block
+
+
+def build_wide(limit: int = 1200, *, cache: str | None = WIDE_CACHE, dtype: str = WIDE_DTYPE) -> pd.DataFrame:
+    """Construct a QC-ed wide matrix with engineered derivative features.
+
+    With ``cache`` (a parquet path, ``config.WIDE_CACHE`` by default) the
+    base pivot is kept between runs and only series changed since the last
+    build are read again; ``None`` rebuilds from scratch.  QC runs on the
+    base columns first, so growth and cross features are only derived for
+    the columns that pass it.  ``dtype``
+    ``"float32"`` halves the footprint of the returned matrix and of every
+    intermediate: the pivot is cast in DuckDB, derived columns are computed
+    as ``dtype`` and QC upcasts one column chunk at a time.  Numerically
+    sensitive consumers (ADF/KPSS, VAR) upcast what they use to float64.
+    """
+
+    raw = _cached_pivot(limit, cache, dtype)
+    if raw.empty:
+        return raw
+    base = raw.interpolate(limit_direction="both")
+    kept = [c for block in iter_column_chunks(base) for c in basic_qc(block, min_len=24).columns]
+    base = base[kept]
+    wide = _cross(pd.concat([base, _growth(base, dtype=dtype)], axis=1), dtype)
+    return wide.loc[:, wide.notna().sum() > 0]
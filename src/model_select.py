@@ -6,6 +6,8 @@ from typing import Iterable, List
 
 import pandas as pd
 
+from .features import iter_column_chunks
+
 
 def select_core_vars(
     wide: pd.DataFrame, top_n: int = 8, prefer: Iterable[str] | None = None
@@ -14,21 +16,27 @@ def select_core_vars(
 
     The heuristic favours columns with few missing values and large
     variability, while optionally forcing the inclusion of ``prefer``
-    series when available.
+    series when available.  ``wide`` is scanned in column chunks upcast to
+    float64, so a float32 matrix is never copied whole.
     """
 
     if wide.empty:
         return []
 
-    complete = wide.dropna(axis=1, how="any")
-    if complete.empty:
+    stds = [
+        block.loc[:, block.notna().all()].std()
+        for block in iter_column_chunks(wide, dtype="float64")
+    ]
+    stds = pd.concat(stds)
+    if stds.empty:
         return []
 
-    stds = complete.std().sort_values(ascending=False)
+    complete = set(stds.index)
+    stds = stds.sort_values(ascending=False)
     candidates = list(stds.head(top_n).index)
 
     if prefer:
-        preferred = [name for name in prefer if name in complete.columns]
+        preferred = [name for name in prefer if name in complete]
         for name in preferred:
             if name in candidates:
                 continue
@@ -2,11 +2,17 @@
 
 from __future__ import annotations
 
+import calendar
+import hashlib
 import json
 import re
-from typing import Dict, List
+from datetime import date
+from functools import lru_cache
+from typing import AbstractSet, Dict, Iterator, List, Tuple
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 
 from .validator import validate_prdse
 from .store import upsert_obs
@@ -17,68 +23,237 @@ PERD_KEYS = ["PRD_DE", "prdDe", "period"]
 UNIT_KEYS = ["UNIT_NM", "UNIT_NM_ENG", "unit", "unitName"]
 
 
-def _pick(payload: Dict, keys: List[str], default=None):
-    for key in keys:
-        if key in payload and payload[key] not in (None, ""):
-            return payload[key]
-    return default
+def dims_hash(dims_json: str) -> str:
+    """Return the dictionary key hash for a canonical (sorted) dims JSON string."""
+
+    return hashlib.md5(dims_json.encode("utf-8")).hexdigest()
+
+
+def _month_end(year: int, month: int) -> str:
+    return date(year, month, calendar.monthrange(year, month)[1]).isoformat()
 
 
-def _anchor_from_prd(prd_de: str, prd_se: str) -> tuple[str, str]:
-    """Derive an ISO anchor date and frequency flag from the period descriptor."""
+@lru_cache(maxsize=1 << 16)
+def _anchor_from_prd(prd_de: str, prd_se: str) -> tuple[str | None, str]:
+    """Derive an ISO anchor date and frequency flag from the period descriptor.
+
+    Periods are anchored at their last day (month/quarter/half/year end).
+    Daily and irregular (``F``/``IR``) descriptors are read by digit count
+    (YYYYMMDD, YYYYMM, YYYY).  Unparseable descriptors yield ``None``.
+    Results are memoised: a catalog only has a few thousand distinct
+    ``(PRD_DE, prdSe)`` pairs, so callers should go through
+    :func:`anchor_periods` rather than loop over observations.
+    """
 
     cleaned = re.sub(r"[^0-9Qq]", "", str(prd_de))
-    if prd_se == "M" and len(cleaned) >= 6:
-        period = pd.Period(f"{cleaned[:4]}-{cleaned[4:6]}", freq="M").to_timestamp("M")
-        return period.strftime("%Y-%m-%d"), "M"
-    if prd_se == "Q" and len(cleaned) >= 5:
-        match = re.match(r"^(\d{4})[Qq]([1-4])$", cleaned)
-        if not match and len(cleaned) >= 6:
-            year, quarter = cleaned[:4], cleaned[-1]
-            candidate = f"{year}Q{quarter}"
-            match = re.match(r"^(\d{4})Q([1-4])$", candidate)
-        if match:
-            year, quarter = match.groups()
-            period = pd.Period(f"{year}Q{quarter}", freq="Q").to_timestamp("Q")
-            return period.strftime("%Y-%m-%d"), "Q"
-    if prd_se == "Y" and len(cleaned) >= 4:
-        period = pd.Period(cleaned[:4], freq="A").to_timestamp("A")
-        return period.strftime("%Y-%m-%d"), "Y"
-    return cleaned, prd_se
+    try:
+        if prd_se == "M" and len(cleaned) >= 6:
+            return _month_end(int(cleaned[:4]), int(cleaned[4:6])), "M"
+        if prd_se == "Q" and len(cleaned) >= 5:
+            match = re.match(r"^(\d{4})[Qq]([1-4])$", cleaned)
+            if not match and len(cleaned) >= 6:
+                match = re.match(r"^(\d{4})Q([1-4])$", f"{cleaned[:4]}Q{cleaned[-1]}")
+            if match:
+                year, quarter = match.groups()
+                return _month_end(int(year), 3 * int(quarter)), "Q"
+        if prd_se == "S" and len(cleaned) >= 5 and cleaned[-1] in ("1", "2"):
+            return _month_end(int(cleaned[:4]), 6 * int(cleaned[-1])), "S"
+        if prd_se == "Y" and len(cleaned) >= 4 and cleaned[:4].isdigit():
+            return _month_end(int(cleaned[:4]), 12), "Y"
+        if prd_se in ("D", "F", "IR"):
+            digits = re.sub(r"[^0-9]", "", cleaned)
+            if len(digits) >= 8:
+                return date(int(digits[:4]), int(digits[4:6]), int(digits[6:8])).isoformat(), prd_se
+            if len(digits) == 6:
+                return _month_end(int(digits[:4]), int(digits[4:6])), prd_se
+            if len(digits) == 4:
+                return f"{digits}-12-31", prd_se
+    except ValueError:
+        pass
+    return None, prd_se
+
+
+def anchor_periods(periods: pd.Series, prd_se: str) -> pd.Series:
+    """Map raw period descriptors to ISO anchor dates (``None`` if unparseable).
+
+    Distinct descriptors are resolved once through the memoised
+    :func:`_anchor_from_prd` and broadcast back by their factor codes.
+    """
+
+    codes, uniques = pd.factorize(periods.astype(str))
+    anchors = np.array([_anchor_from_prd(u, prd_se)[0] for u in uniques] + [None], dtype=object)
+    return pd.Series(anchors[codes], index=periods.index, dtype=object)
+
+
+def _coalesce(frame: pd.DataFrame, keys: List[str]) -> pd.Series:
+    """Return, per row, the first alias column that is neither null nor ``""``."""
+
+    picked = pd.Series(None, index=frame.index, dtype=object)
+    for key in keys:
+        if key not in frame.columns:
+            continue
+        column = frame[key].astype(object)
+        column = column.mask(column.isna() | (column == ""))
+        picked = picked.mask(picked.isna(), column)
+    return picked
+
+
+def _parse_values(values: pd.Series) -> pd.Series:
+    """Parse KOSIS value strings (``"1,234.5"``) to float; unparseable → NaN."""
+
+    cleaned = values.astype(str).str.replace(",", "", regex=False).str.strip()
+    return pd.to_numeric(cleaned.where(values.notna()), errors="coerce")
+
+
+def _dims_columns(frame: pd.DataFrame) -> tuple[pd.Series, pd.Series]:
+    """Return per-row ``(dims_json, dims_hash)`` computed once per distinct dims tuple."""
+
+    excluded = set(PERD_KEYS + VAL_KEYS)
+    columns = [c for c in frame.columns if c not in excluded]
+    if columns:
+        codes = frame.groupby(columns, dropna=False, sort=False).ngroup().to_numpy()
+        first = frame.loc[~pd.Series(codes).duplicated().to_numpy(), columns]
+        uniques = [json.dumps(d, ensure_ascii=False, sort_keys=True) for d in first.to_dict(orient="records")]
+    else:
+        codes, uniques = np.zeros(len(frame), dtype=np.int64), ["{}"]
+    dims_json = np.array(uniques, dtype=object)
+    hashes = np.array([dims_hash(d) for d in uniques], dtype=object)
+    return (
+        pd.Series(dims_json[codes], index=frame.index),
+        pd.Series(hashes[codes], index=frame.index),
+    )
+
+
+def normalize_frame(logical_name: str, raw: pd.DataFrame | pa.Table, prd_se: str) -> pd.DataFrame:
+    """Columnar :func:`normalize_payload` for a whole raw frame (or Arrow table).
+
+    Aliases are resolved per column, values parsed with vectorised string ops,
+    period descriptors anchored once per distinct value and dims serialised and
+    hashed once per distinct dims tuple, so cost no longer scales with Python
+    work per row.  Rows without a parseable value or period are dropped.
+    """
+
+    validate_prdse(prd_se)
+    frame = raw.to_pandas() if isinstance(raw, pa.Table) else raw
+    if frame.empty:
+        return pd.DataFrame()
+    frame = frame.reset_index(drop=True)
+
+    period_raw = _coalesce(frame, PERD_KEYS)
+    value = _parse_values(_coalesce(frame, VAL_KEYS))
+    keep = period_raw.notna() & value.notna()
+
+    period = pd.Series(None, index=frame.index, dtype=object)
+    period[keep] = anchor_periods(period_raw[keep], prd_se)
+    keep &= period.notna()
+    if not keep.any():
+        return pd.DataFrame()
+
+    frame = frame[keep]
+    dims_json, hashes = _dims_columns(frame)
+    df = pd.DataFrame(
+        {
+            "logical_name": logical_name,
+            "dims_hash": hashes,
+            "period": period[keep],
+            "freq": prd_se,
+            "value": value[keep].astype(float),
+            "unit": _coalesce(frame, UNIT_KEYS).fillna(""),
+            "dims": dims_json,
+        }
+    )
+    return df.drop_duplicates(subset=["dims_hash", "period"]).sort_values(["dims_hash", "period"])
 
 
 def normalize_payload(logical_name: str, rows: List[Dict], prd_se: str) -> pd.DataFrame:
     """Convert raw payload rows into the canonical observation schema."""
 
-    validate_prdse(prd_se)
-    records: List[Dict] = []
-    for row in rows:
-        period_raw = _pick(row, PERD_KEYS)
-        value_raw = _pick(row, VAL_KEYS)
-        unit = _pick(row, UNIT_KEYS, default="")
-        if period_raw in (None, "") or value_raw in (None, ""):
+    return normalize_frame(logical_name, pd.DataFrame(rows), prd_se)
+
+
+_NAN_MASK = "__nan__"
+
+
+def frame_to_ipc(frame: pd.DataFrame) -> bytes:
+    """Serialise a raw frame to an Arrow IPC stream for a worker process.
+
+    Arrow has a single null, so every object column whose missing values
+    include NaN (rather than ``None``) travels with a ``__nan__<column>``
+    boolean mask; :func:`frame_from_ipc` restores each row's form so dims
+    JSON and hashes match an in-process :func:`normalize_frame`.  Raises
+    ``pa.ArrowException`` for columns Arrow cannot type (mixed objects);
+    callers fall back in-process.
+    """
+
+    masks: Dict[str, np.ndarray] = {}
+    for column in frame.columns:
+        values = frame[column]
+        if values.dtype != object:
             continue
-        try:
-            value = float(str(value_raw).replace(",", ""))
-        except Exception:
+        missing = values.isna().to_numpy()
+        if missing.any():
+            nan = np.zeros(len(values), dtype=bool)
+            nan[missing] = [v is not None for v in values.to_numpy()[missing]]
+            if nan.any():
+                masks[_NAN_MASK + str(column)] = nan
+    table = pa.Table.from_pandas(frame.assign(**masks) if masks else frame, preserve_index=False)
+    return table_to_ipc(table)
+
+
+def frame_from_ipc(payload: bytes) -> pd.DataFrame:
+    frame = pa.ipc.open_stream(payload).read_all().to_pandas()
+    for mask in [c for c in frame.columns if str(c).startswith(_NAN_MASK)]:
+        column = mask[len(_NAN_MASK) :]
+        frame[column] = frame[column].astype(object).mask(frame.pop(mask).to_numpy(), np.nan)
+    return frame
+
+
+def table_to_ipc(table: pa.Table) -> bytes:
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def normalize_groups(
+    raw: pd.DataFrame, skip: AbstractSet[Tuple[str, str]] = frozenset()
+) -> Iterator[Tuple[Tuple[str, str], pd.DataFrame | ValueError]]:
+    """Normalise ``raw`` per ``(logical_name, prdSe)`` group.
+
+    Yields ``(key, frame)`` per group, or ``(key, error)`` for a group whose
+    ``prdSe`` or periods are invalid; keys in ``skip`` are left out.
+    """
+
+    for (logical_name, prd_se), group in raw.groupby(["logical_name", "prdSe"], dropna=False):
+        key = (str(logical_name), str(prd_se))
+        if key in skip:
             continue
-        period, freq = _anchor_from_prd(period_raw, prd_se)
-        dims = {k: v for k, v in row.items() if k not in set(PERD_KEYS + VAL_KEYS)}
-        series_key = logical_name + "|" + json.dumps(dims, ensure_ascii=False, sort_keys=True)
-        records.append(
-            {
-                "series_key": series_key,
-                "period": period,
-                "freq": freq,
-                "value": value,
-                "unit": unit,
-                "dims": json.dumps(dims, ensure_ascii=False),
-            }
-        )
-    df = pd.DataFrame(records)
-    if not df.empty:
-        df = df.drop_duplicates(subset=["series_key", "period"]).sort_values(["series_key", "period"])
-    return df
+        try:
+            yield key, normalize_frame(key[0], group, key[1])
+        except ValueError as exc:
+            yield key, exc
+
+
+def normalize_chunk_ipc(
+    payload: bytes, skip: AbstractSet[Tuple[str, str]] = frozenset()
+) -> Tuple[bytes, List[Tuple[Tuple[str, str], str]]]:
+    """Process-pool entry point: a whole IPC raw chunk in, grouped and normalised here.
+
+    Returns one IPC table with every group's observations (``b""`` if none)
+    and the ``(key, error)`` of the groups that failed.
+    """
+
+    frames: List[pd.DataFrame] = []
+    failed: List[Tuple[Tuple[str, str], str]] = []
+    for key, result in normalize_groups(frame_from_ipc(payload), skip):
+        if isinstance(result, ValueError):
+            failed.append((key, str(result)))
+        elif not result.empty:
+            frames.append(result)
+    if not frames:
+        return b"", failed
+    table = pa.Table.from_pandas(pd.concat(frames, ignore_index=True), preserve_index=False)
+    return table_to_ipc(table), failed
 
 
 def store_obs(df_norm: pd.DataFrame) -> None:
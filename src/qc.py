@@ -2,21 +2,126 @@
 
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 
+REPORT_COLUMNS = [
+    "n_valid",
+    "na_ratio",
+    "std",
+    "max_const_run",
+    "stale_tail",
+    "duplicate_of",
+    "keep",
+    "reason",
+]
 
-def basic_qc(wide: pd.DataFrame, min_len: int = 24, max_na_ratio: float = 0.2, min_std: float = 1e-8) -> pd.DataFrame:
-    """Filter columns failing simple length, missingness, or variance checks."""
-
-    keep = []
-    for column in wide.columns:
-        series = wide[column]
-        valid = series.dropna()
-        if len(valid) < min_len:
-            continue
-        if series.isna().mean() > max_na_ratio:
-            continue
-        if valid.std(ddof=0) < min_std:
-            continue
-        keep.append(column)
-    return wide[keep]
+
+def _const_runs(values: np.ndarray) -> np.ndarray:
+    """Length of the run of equal values ending at each row (NaN breaks a run)."""
+
+    rows = np.arange(len(values))[:, None]
+    same = np.zeros(values.shape, dtype=bool)
+    same[1:] = values[1:] == values[:-1]
+    last_break = np.maximum.accumulate(np.where(same, -1, rows), axis=0)
+    return rows - last_break + 1
+
+
+def _duplicate_of(values: np.ndarray, columns: pd.Index) -> np.ndarray:
+    """Name of the first earlier column with identical contents, else ``None``."""
+
+    out = np.full(values.shape[1], None, dtype=object)
+    if values.shape[1] < 2 or len(values) == 0:
+        return out
+    rows = np.ascontiguousarray(values.T).view(np.dtype((np.void, values.dtype.itemsize * len(values))))
+    _, first, inverse = np.unique(rows.ravel(), return_index=True, return_inverse=True)
+    owner = first[inverse.ravel()]
+    dup = owner != np.arange(values.shape[1])
+    out[dup] = np.asarray(columns, dtype=object)[owner[dup]]
+    return out
+
+
+def qc_report(
+    wide: pd.DataFrame,
+    min_len: int = 24,
+    max_na_ratio: float = 0.2,
+    min_std: float = 1e-8,
+    *,
+    max_const_run: int | None = None,
+    max_stale_tail: int | None = None,
+    drop_duplicates: bool = False,
+) -> pd.DataFrame:
+    """Per-column QC statistics and the reason each dropped column failed.
+
+    Everything is computed for all columns in one NumPy pass: valid counts,
+    NA ratio, population std of the valid values, the longest run of
+    repeated values, the stale tail (trailing NaNs plus the repeated run
+    they follow) and exact duplicates of an earlier column.  The length,
+    missingness and variance checks always apply; the run, stale-tail and
+    duplicate checks are reported but only enforced when their argument is
+    set.  ``reason`` names the first failed check (``""`` when kept).
+    """
+
+    values = wide.to_numpy(dtype=np.float64)
+    valid = ~np.isnan(values)
+    n_rows = len(values)
+    n_valid = valid.sum(axis=0)
+    na_ratio = 1.0 - n_valid / n_rows if n_rows else np.full(values.shape[1], np.nan)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        filled = np.where(valid, values, 0.0)
+        mean = filled.sum(axis=0) / n_valid
+        std = np.sqrt(np.where(valid, (values - mean) ** 2, 0.0).sum(axis=0) / n_valid)
+    std[n_valid == 0] = np.nan
+
+    if n_rows:
+        runs = _const_runs(values)
+        max_run = np.where(valid, runs, 0).max(axis=0)
+        last = n_rows - 1 - np.argmax(valid[::-1], axis=0)
+        tail_run = np.take_along_axis(runs, last[None, :], axis=0)[0]
+        stale = np.where(n_valid > 0, (n_rows - 1 - last) + tail_run, n_rows)
+    else:
+        max_run = stale = np.zeros(values.shape[1], dtype=np.int64)
+    duplicate_of = _duplicate_of(values, wide.columns)
+
+    checks = [
+        ("short", n_valid < min_len),
+        ("na_ratio", na_ratio > max_na_ratio),
+        ("low_std", std < min_std),
+    ]
+    if max_const_run is not None:
+        checks.append(("constant_run", max_run > max_const_run))
+    if max_stale_tail is not None:
+        checks.append(("stale_tail", stale > max_stale_tail))
+    if drop_duplicates:
+        checks.append(("duplicate", pd.notna(duplicate_of)))
+
+    reason = np.full(values.shape[1], "", dtype=object)
+    for name, failed in reversed(checks):
+        reason[failed] = name
+    return pd.DataFrame(
+        {
+            "n_valid": n_valid,
+            "na_ratio": na_ratio,
+            "std": std,
+            "max_const_run": max_run,
+            "stale_tail": stale,
+            "duplicate_of": duplicate_of,
+            "keep": reason == "",
+            "reason": reason,
+        },
+        index=wide.columns,
+        columns=REPORT_COLUMNS,
+    )
+
+
+def basic_qc(wide: pd.DataFrame, min_len: int = 24, max_na_ratio: float = 0.2, min_std: float = 1e-8, **checks) -> pd.DataFrame:
+    """Filter columns failing simple length, missingness, or variance checks.
+
+    Extra keyword checks (``max_const_run``, ``max_stale_tail``,
+    ``drop_duplicates``) are passed to :func:`qc_report`, which also explains
+    every dropped column.
+    """
+
+    report = qc_report(wide, min_len, max_na_ratio, min_std, **checks)
+    return wide.loc[:, report["keep"].to_numpy()]
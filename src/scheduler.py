@@ -0,0 +1,250 @@
+"""Staleness-driven refresh scheduling for catalog series.
+
+Every catalog row is queued by the moment its next period is expected to be
+published: the period after the last observed ``PRD_DE`` plus a per-``prdSe``
+release lag (``config.RELEASE_LAG_DAYS``).  Series that were never fetched are
+due immediately, and series whose expected release has passed without new data
+are re-checked every ``config.RECHECK_DAYS`` instead of on every run.
+"""
+
+from __future__ import annotations
+
+import heapq
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from . import snapshot, store
+from .config import RATE_SLEEP, RECHECK_DAYS, RELEASE_LAG_DAYS, SCHED_WORKERS, SNAPSHOT_DIR
+from .normalize import PERD_KEYS, normalize_frame, store_obs
+from .utils import RateLimiter
+
+KEY_FIELDS = ["logical_name", "mode", "userStatsId", "orgId", "tblId", "itmId"] + [
+    f"objL{i}" for i in range(1, 9)
+]
+_STEP_MONTHS = {"M": 1, "Q": 3, "S": 6, "Y": 12}
+_RETRY_BASE_SECONDS = 60.0
+
+
+def catalog_key(row: Dict[str, Any]) -> str:
+    """Return a stable identifier for a catalog row."""
+
+    return "|".join(str(row.get(field, "") or "") for field in KEY_FIELDS)
+
+
+def _ts(value: Any) -> Optional[datetime]:
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    return pd.Timestamp(value).to_pydatetime()
+
+
+def _period_end(prd_de: Any, prd_se: str) -> Optional[pd.Timestamp]:
+    """Return the last calendar day covered by ``prd_de`` (M/Q/S/Y only)."""
+
+    digits = re.sub(r"[^0-9]", "", str(prd_de or ""))
+    try:
+        if prd_se == "Y" and len(digits) >= 4:
+            return pd.Timestamp(f"{digits[:4]}-12-31")
+        if prd_se == "M" and len(digits) >= 6:
+            return pd.Timestamp(f"{digits[:4]}-{digits[4:6]}-01") + pd.offsets.MonthEnd(0)
+        if prd_se in ("Q", "S") and len(digits) >= 5:
+            index = int(digits[-1])
+            months = _STEP_MONTHS[prd_se]
+            if not 1 <= index <= 12 // months:
+                return None
+            return pd.Timestamp(f"{digits[:4]}-{index * months:02d}-01") + pd.offsets.MonthEnd(0)
+    except ValueError:
+        return None
+    return None
+
+
+def next_due(
+    prd_se: str,
+    last_period: Optional[str],
+    last_success: Optional[datetime],
+    *,
+    failures: int = 0,
+    now: datetime,
+) -> datetime:
+    """Compute when a series should be fetched next.
+
+    Failed attempts back off exponentially (capped at the re-check interval);
+    otherwise the due time is the expected release of the period following
+    ``last_period``, or ``last_success`` plus the re-check interval once that
+    release date has already been checked.
+    """
+
+    recheck = timedelta(days=RECHECK_DAYS.get(prd_se, 7))
+    if failures:
+        backoff = min(_RETRY_BASE_SECONDS * 2 ** (failures - 1), recheck.total_seconds())
+        return now + timedelta(seconds=backoff)
+    if last_success is None:
+        return now
+    end = _period_end(last_period, prd_se)
+    if end is not None and prd_se in RELEASE_LAG_DAYS:
+        following = end + pd.offsets.MonthEnd(_STEP_MONTHS[prd_se])
+        due = following.to_pydatetime() + timedelta(days=RELEASE_LAG_DAYS[prd_se])
+        if due > last_success:
+            return due
+    return last_success + recheck
+
+
+def _latest_period(frame: pd.DataFrame) -> Optional[str]:
+    for key in PERD_KEYS:
+        if key in frame.columns:
+            values = frame[key].dropna().astype(str)
+            values = values[values != ""]
+            if not values.empty:
+                return str(values.max())
+    return None
+
+
+def build_queue(
+    catalog: pd.DataFrame, state: pd.DataFrame, now: datetime
+) -> Tuple[List[Tuple[datetime, str]], Dict[str, Tuple[Dict[str, Any], Dict[str, Any]]]]:
+    """Return a due-time heap and ``key -> (catalog row, state record)`` entries."""
+
+    known = {rec["key"]: rec for rec in state.to_dict(orient="records")} if not state.empty else {}
+    heap: List[Tuple[datetime, str]] = []
+    entries: Dict[str, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+    for row in catalog.to_dict(orient="records"):
+        key = catalog_key(row)
+        if key in entries:
+            continue
+        rec = dict(known.get(key) or {"key": key, "failures": 0})
+        rec["logical_name"] = row.get("logical_name", "")
+        rec["prd_se"] = str(row.get("prdSe", "")).strip()
+        rec["last_success"] = _ts(rec.get("last_success"))
+        rec["last_attempt"] = _ts(rec.get("last_attempt"))
+        rec["failures"] = int(rec.get("failures") or 0)
+        due = _ts(rec.get("next_due")) or next_due(
+            rec["prd_se"],
+            rec.get("last_period"),
+            rec["last_success"],
+            failures=rec["failures"],
+            now=rec["last_attempt"] or now,
+        )
+        rec["next_due"] = due
+        entries[key] = (row, rec)
+        heapq.heappush(heap, (due, key))
+    return heap, entries
+
+
+def _on_success(row: Dict[str, Any], rec: Dict[str, Any], frame: pd.DataFrame, now: datetime) -> None:
+    frame = frame.copy()
+    for pos, column in enumerate(["logical_name", "orgId", "tblId", "prdSe"]):
+        if column not in frame.columns:
+            frame.insert(pos, column, row.get(column, ""))
+    records = frame.to_dict(orient="records")
+    store.save_raw("scheduler", rec["key"], records)
+    if records:
+        try:
+            store_obs(normalize_frame(rec["logical_name"] or "kosis.series", frame, rec["prd_se"]))
+        except ValueError as exc:
+            print(f"[sched][warn] {rec['key']} normalise skipped: {exc}")
+
+    newest = _latest_period(frame)
+    if newest and (not rec.get("last_period") or newest > str(rec["last_period"])):
+        rec["last_period"] = newest
+    rec["last_success"] = now
+    rec["last_attempt"] = now
+    rec["failures"] = 0
+    rec["next_due"] = next_due(rec["prd_se"], rec.get("last_period"), now, now=now)
+
+
+def _on_failure(rec: Dict[str, Any], exc: Exception, now: datetime) -> None:
+    rec["last_attempt"] = now
+    rec["failures"] = int(rec.get("failures") or 0) + 1
+    rec["next_due"] = next_due(
+        rec["prd_se"], rec.get("last_period"), rec.get("last_success"), failures=rec["failures"], now=now
+    )
+    print(f"[sched][ERR] {rec['key']} attempt={rec['failures']} {type(exc).__name__}: {exc}")
+
+
+def run_scheduler(
+    catalog: pd.DataFrame,
+    fetch: Callable[[Dict[str, Any]], pd.DataFrame],
+    *,
+    workers: int = SCHED_WORKERS,
+    rate_sleep: float = RATE_SLEEP,
+    once: bool = False,
+    poll: float = 60.0,
+    snapshot_dir: Optional[str] = SNAPSHOT_DIR,
+    verbose: bool = False,
+) -> Dict[str, int]:
+    """Keep catalog series fresh by fetching each one only when it is due.
+
+    ``fetch`` receives a catalog row dict and returns the raw payload frame.
+    Calls are spread over ``workers`` threads but paced by a shared
+    :class:`~src.utils.RateLimiter`, so the pool never exceeds the API rate.
+    With ``once`` the loop exits as soon as nothing is due or in flight.
+    Whenever the queue drains after new data arrived, a fresh snapshot is
+    exported to ``snapshot_dir`` (``None`` disables) for read-only stages.
+    """
+
+    store.init().close()
+    heap, entries = build_queue(catalog, store.load_fetch_state(), datetime.now())
+    limiter = RateLimiter(rate_sleep)
+    counts = {"fetched": 0, "failed": 0}
+    if verbose:
+        due_now = sum(1 for due, _ in heap if due <= datetime.now())
+        print(f"[sched] series={len(entries)} due_now={due_now} workers={workers}")
+
+    def _fetch(row: Dict[str, Any]) -> pd.DataFrame:
+        limiter.wait()
+        return fetch(row)
+
+    inflight: Dict[Future, str] = {}
+    unsnapshotted = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        while True:
+            now = datetime.now()
+            while heap and heap[0][0] <= now and len(inflight) < max(1, workers):
+                _, key = heapq.heappop(heap)
+                inflight[pool.submit(_fetch, entries[key][0])] = key
+
+            if inflight:
+                finished, _ = wait(list(inflight), timeout=poll, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    key = inflight.pop(future)
+                    row, rec = entries[key]
+                    now = datetime.now()
+                    try:
+                        frame = future.result()
+                    except Exception as exc:  # pragma: no cover - network usage
+                        _on_failure(rec, exc, now)
+                        counts["failed"] += 1
+                    else:
+                        _on_success(row, rec, frame, now)
+                        counts["fetched"] += 1
+                        unsnapshotted += 1
+                        if verbose:
+                            print(
+                                f"[sched] {key} rows={len(frame)} last_period={rec.get('last_period')} "
+                                f"next_due={rec['next_due']:%Y-%m-%d %H:%M}"
+                            )
+                    store.save_fetch_state(rec)
+                    heapq.heappush(heap, (rec["next_due"], key))
+                continue
+
+            if unsnapshotted and snapshot_dir:
+                path = snapshot.export_snapshot(snapshot_dir)
+                unsnapshotted = 0
+                if verbose:
+                    print(f"[sched] snapshot → {path}")
+            if not heap or once:
+                break
+            delay = (heap[0][0] - now).total_seconds()
+            if verbose and delay > poll:
+                print(f"[sched] idle; next due {heap[0][1]} at {heap[0][0]:%Y-%m-%d %H:%M}")
+            # Release the DuckDB file lock while idle; the next fetch reopens the writer.
+            store.close()
+            time.sleep(max(0.0, min(poll, delay)))
+
+    if verbose:
+        print(f"[sched] done fetched={counts['fetched']} failed={counts['failed']}")
+    return counts
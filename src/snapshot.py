@@ -0,0 +1,147 @@
+"""Versioned columnar snapshots of the observation store.
+
+After an ingest the committed ``obs``/``series``/``series_stats``/``name_stats``
+tables are exported to ``<root>/<version>/<table>.parquet`` and
+``<root>/LATEST`` is switched to the new version atomically.  Readers memory-map the files with column
+projection and never touch the DuckDB writer lock.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+import duckdb
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from . import store
+from .config import SNAPSHOT_DIR, SNAPSHOT_KEEP
+
+LATEST = "LATEST"
+
+
+def _sql_path(path: str) -> str:
+    return path.replace("'", "''")
+
+
+def list_snapshots(root: str = SNAPSHOT_DIR) -> List[str]:
+    """Return snapshot version names under ``root``, oldest first."""
+
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        name
+        for name in os.listdir(root)
+        if not name.startswith(".") and os.path.isfile(os.path.join(root, name, "obs.parquet"))
+    )
+
+
+def latest_snapshot(root: str = SNAPSHOT_DIR) -> Optional[str]:
+    """Return the directory of the current snapshot, if one was exported."""
+
+    pointer = os.path.join(root, LATEST)
+    if not os.path.isfile(pointer):
+        return None
+    with open(pointer, "r", encoding="utf-8") as handle:
+        version = handle.read().strip()
+    path = os.path.join(root, version)
+    return path if os.path.isfile(os.path.join(path, "obs.parquet")) else None
+
+
+def export_snapshot(root: str = SNAPSHOT_DIR, keep: int = SNAPSHOT_KEEP) -> str:
+    """Export the committed store to a new snapshot version and return its path.
+
+    ``obs.parquet`` carries ``logical_name`` next to ``series_id`` (dictionary
+    encoded, so nearly free) and is sorted by ``(series_id, period)`` so
+    row-group statistics support predicate push-down.  Only the newest
+    ``keep`` versions are retained.
+    """
+
+    version = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+    tmp = os.path.join(root, f".{version}.tmp")
+    os.makedirs(tmp, exist_ok=True)
+    connection = store.cursor()
+    connection.execute(
+        f"""
+        COPY (
+            SELECT s.logical_name, o.series_id, o.period, o.value
+            FROM obs o JOIN series s USING (series_id)
+            ORDER BY o.series_id, o.period
+        ) TO '{_sql_path(os.path.join(tmp, "obs.parquet"))}' (FORMAT PARQUET, COMPRESSION ZSTD);
+        COPY series TO '{_sql_path(os.path.join(tmp, "series.parquet"))}' (FORMAT PARQUET, COMPRESSION ZSTD);
+        COPY series_stats TO '{_sql_path(os.path.join(tmp, "series_stats.parquet"))}' (FORMAT PARQUET, COMPRESSION ZSTD);
+        COPY name_stats TO '{_sql_path(os.path.join(tmp, "name_stats.parquet"))}' (FORMAT PARQUET, COMPRESSION ZSTD);
+        """
+    )
+    final = os.path.join(root, version)
+    os.replace(tmp, final)
+    pointer_tmp = os.path.join(root, f".{LATEST}.tmp")
+    with open(pointer_tmp, "w", encoding="utf-8") as handle:
+        handle.write(version)
+    os.replace(pointer_tmp, os.path.join(root, LATEST))
+
+    for old in list_snapshots(root)[: -max(1, keep)]:
+        shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+    return final
+
+
+def open_snapshot(path: Optional[str] = None) -> duckdb.DuckDBPyConnection:
+    """Return an in-memory DuckDB connection exposing a snapshot as tables.
+
+    ``obs``, ``series``, ``series_stats``, ``name_stats`` and ``obs_long`` are
+    views over the snapshot files, so the usual store queries run unchanged
+    against a frozen committed state.  Snapshots exported before a stats
+    table existed get a view computing it from ``obs``.
+    """
+
+    path = path or latest_snapshot()
+    if path is None:
+        raise FileNotFoundError(f"no snapshot under {SNAPSHOT_DIR!r}; run step 2 or `run_store.py snapshot`")
+    obs_file = _sql_path(os.path.join(path, "obs.parquet"))
+    series_file = _sql_path(os.path.join(path, "series.parquet"))
+
+    def _stats(name: str, select: str) -> str:
+        stats_file = os.path.join(path, f"{name}.parquet")
+        if os.path.isfile(stats_file):
+            return f"SELECT * FROM read_parquet('{_sql_path(stats_file)}')"
+        return select.format(where="")
+
+    connection = duckdb.connect(":memory:")
+    connection.execute(
+        f"""
+        CREATE VIEW obs AS SELECT series_id, period, value FROM read_parquet('{obs_file}');
+        CREATE VIEW series AS SELECT * FROM read_parquet('{series_file}');
+        CREATE VIEW series_stats AS {_stats("series_stats", store.SERIES_STATS_SELECT)};
+        CREATE VIEW name_stats AS {_stats("name_stats", store.NAME_STATS_SELECT)};
+        CREATE VIEW obs_long AS
+        SELECT s.series_id, s.logical_name, s.logical_name || '|' || s.dims AS series_key,
+               o.period, s.freq, o.value, s.unit, s.dims
+        FROM obs o JOIN series s USING (series_id);
+        """
+    )
+    return connection
+
+
+def read_obs(
+    path: Optional[str] = None,
+    columns: Optional[Sequence[str]] = None,
+    filters=None,
+) -> pa.Table:
+    """Memory-map ``obs.parquet`` of a snapshot (latest by default).
+
+    ``columns`` projects the read; ``filters`` uses the pyarrow DNF syntax,
+    e.g. ``[("period", ">=", date(2015, 1, 1))]``.
+    """
+
+    path = path or latest_snapshot()
+    if path is None:
+        raise FileNotFoundError(f"no snapshot under {SNAPSHOT_DIR!r}; run step 2 or `run_store.py snapshot`")
+    return pq.read_table(
+        os.path.join(path, "obs.parquet"),
+        columns=list(columns) if columns else None,
+        filters=filters,
+        memory_map=True,
+    )
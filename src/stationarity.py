@@ -2,12 +2,34 @@
 
 from __future__ import annotations
 
-from typing import Dict, Tuple
+import hashlib
+import multiprocessing
+import os
+import tempfile
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from typing import Callable, ContextManager, Dict, List, Optional, Sequence, Tuple
 
 import numpy as np
 import pandas as pd
+import statsmodels
 from statsmodels.tsa.stattools import adfuller, kpss
 
+from . import unitroot
+from .config import STATIONARITY_CACHE, STATIONARITY_ENGINE, STATIONARITY_WORKERS
+from .features import iter_column_chunks
+
+REPORT_COLUMNS = [
+    "var",
+    "transform",
+    "adf_p_raw",
+    "adf_p_trans",
+    "kpss_p_trans",
+    "n_obs",
+    "std_trans",
+]
+
 
 def _clean_series(series: pd.Series) -> pd.Series:
     """Return a numeric series with infinities removed."""
@@ -41,16 +63,19 @@ def kpss_p(series: pd.Series) -> float:
         return 0.0
 
 
-def decide_transform(series: pd.Series) -> str:
+def decide_transform(series: pd.Series, p_value: Optional[float] = None) -> str:
     """Choose an appropriate transformation for ``series``.
 
     Rules:
     - If the ADF p-value is <= 0.05, keep the series as-is (``"none"``).
     - Otherwise, attempt a log-difference when at least 90% of the
       observations are positive; fall back to a first difference.
+
+    ``p_value`` skips the test when the ADF p-value is already known.
     """
 
-    p_value = adf_p(series)
+    if p_value is None:
+        p_value = adf_p(series)
     if p_value <= 0.05:
         return "none"
     positive_ratio = float((series > 0).sum()) / float(len(series)) if len(series) else 0.0
@@ -59,16 +84,266 @@ def decide_transform(series: pd.Series) -> str:
     return "diff"
 
 
-def apply_transform(frame: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, str]]:
-    """Apply automatic transformations to each column of ``frame``."""
+def _raw_tests(values: np.ndarray) -> Tuple[float, str]:
+    series = pd.Series(values)
+    p_value = adf_p(series)
+    return p_value, decide_transform(series, p_value)
 
-    transformed: Dict[str, pd.Series] = {}
-    mapping: Dict[str, str] = {}
 
+def _trans_tests(values: np.ndarray) -> Tuple[float, float]:
+    series = pd.Series(values)
+    return adf_p(series), kpss_p(series)
+
+
+_ENGINES = ("statsmodels", "numpy", "validate")
+_BATCH_SERIES = 256
+_VALIDATE_TOL = 1e-6
+
+
+def _batched(frame: pd.DataFrame, batch: Callable, single: Callable, short: float) -> pd.Series:
+    """Run a :mod:`src.unitroot` kernel over equal-length groups of cleaned columns.
+
+    Columns are cleaned like :func:`adf_p` (non-finite values dropped) and
+    stacked by length, ``_BATCH_SERIES`` at a time; series shorter than 12
+    get ``short`` and those the kernel returns as NaN are tested one by one
+    with ``single``.
+    """
+
+    out = pd.Series(np.nan, index=frame.columns, dtype=float)
+    cleaned = {}
+    for i in range(frame.shape[1]):
+        values = frame.iloc[:, i].to_numpy(dtype=float)
+        cleaned[i] = values[np.isfinite(values)]
+    by_length: Dict[int, List[int]] = {}
+    for i, values in cleaned.items():
+        by_length.setdefault(len(values), []).append(i)
+    for length, positions in by_length.items():
+        if length < 12:
+            out.iloc[positions] = short
+            continue
+        for start in range(0, len(positions), _BATCH_SERIES):
+            block = positions[start : start + _BATCH_SERIES]
+            out.iloc[block] = batch(np.vstack([cleaned[i] for i in block]))
+    for i in np.flatnonzero(out.isna().to_numpy()):
+        out.iloc[i] = single(frame.iloc[:, i])
+    return out
+
+
+def _many(frame: pd.DataFrame, test: str, engine: str) -> pd.Series:
+    if engine not in _ENGINES:
+        raise ValueError(f"unknown stationarity engine: {engine!r} ({'/'.join(_ENGINES)})")
+    if test == "adf":
+        single, batch, short = adf_p, unitroot.adf_pvalues, 1.0
+    else:
+        single, batch, short = kpss_p, unitroot.kpss_pvalues, 0.0
+    if engine == "numpy":
+        return _batched(frame, batch, single, short)
+    reference = pd.Series([single(frame.iloc[:, i]) for i in range(frame.shape[1])], index=frame.columns, dtype=float)
+    if engine == "validate":
+        gap = (_batched(frame, batch, single, short) - reference).abs()
+        bad = gap[gap > _VALIDATE_TOL]
+        if not bad.empty:
+            warnings.warn(
+                f"numpy {test.upper()} differs from statsmodels by up to {bad.max():.2e} "
+                f"for {len(bad)} column(s): {', '.join(map(str, bad.index[:5]))}",
+                RuntimeWarning,
+                stacklevel=3,
+            )
+    return reference
+
+
+def adf_p_many(frame: pd.DataFrame, engine: str = STATIONARITY_ENGINE) -> pd.Series:
+    """:func:`adf_p` of every column of ``frame``.
+
+    ``engine="numpy"`` runs the batched kernels of :mod:`src.unitroot`,
+    ``"statsmodels"`` loops over :func:`adf_p` and ``"validate"`` runs both,
+    warns where they disagree and returns the statsmodels values.
+    """
+
+    return _many(frame, "adf", engine)
+
+
+def kpss_p_many(frame: pd.DataFrame, engine: str = STATIONARITY_ENGINE) -> pd.Series:
+    """:func:`kpss_p` of every column of ``frame``; ``engine`` as in :func:`adf_p_many`."""
+
+    return _many(frame, "kpss", engine)
+
+
+def screen_stationarity(wide: pd.DataFrame, engine: str = "numpy") -> pd.DataFrame:
+    """ADF and KPSS p-values of every column of ``wide`` (batched by default)."""
+
+    return pd.DataFrame(
+        {
+            "n_obs": wide.notna().sum(),
+            "adf_p": adf_p_many(wide, engine),
+            "kpss_p": kpss_p_many(wide, engine),
+        }
+    ).rename_axis("var").reset_index()
+
+
+# Everything a cached result depends on besides the values themselves; a
+# change here (or a statsmodels upgrade) invalidates every entry.
+_TEST_SETTINGS = (
+    f"statsmodels={statsmodels.__version__};adf=c,AIC;kpss=c,auto;min_obs=12;transform=0.05,0.9"
+)
+_CACHE_LIMIT = 100_000
+
+
+class StationarityCache:
+    """Stationarity test results on disk, keyed by series content and test settings.
+
+    A key hashes the test role (``"raw"``: ADF and chosen transform,
+    ``"trans"``: ADF and KPSS of the transformed series), the engine (the
+    batched kernels and statsmodels agree only to a tolerance), the settings
+    above and the float64 values, so an unchanged series is never tested twice
+    across runs.  The file is a small Parquet table written atomically; the
+    ``_CACHE_LIMIT`` most recently used entries are kept.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.entries: Dict[str, list] = {}
+        self.dirty = False
+        if os.path.exists(path):
+            frame = pd.read_parquet(path)
+            for row in frame.itertuples(index=False):
+                self.entries[row.key] = [row.role, row.adf_p, row.kpss_p, row.transform, row.used]
+
+    @staticmethod
+    def key(role: str, values: np.ndarray, engine: str) -> str:
+        digest = hashlib.blake2b(f"{role}|{engine}|{_TEST_SETTINGS}|".encode("utf-8"), digest_size=16)
+        digest.update(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[tuple]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        entry[4] = pd.Timestamp.now()
+        self.dirty = True
+        role, adf, kpss_value, transform, _ = entry
+        return (float(adf), transform) if role == "raw" else (float(adf), float(kpss_value))
+
+    def put(self, key: str, role: str, result: tuple) -> None:
+        adf, second = result
+        kpss_value, transform = (np.nan, second) if role == "raw" else (second, None)
+        self.entries[key] = [role, adf, kpss_value, transform, pd.Timestamp.now()]
+        self.dirty = True
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        frame = pd.DataFrame(
+            [[key, *entry] for key, entry in self.entries.items()],
+            columns=["key", "role", "adf_p", "kpss_p", "transform", "used"],
+        )
+        frame = frame.nlargest(_CACHE_LIMIT, "used") if len(frame) > _CACHE_LIMIT else frame
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(self.path)}.", suffix=".tmp")
+        os.close(fd)
+        try:
+            frame.to_parquet(tmp, index=False)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self.dirty = False
+
+    def __enter__(self) -> "StationarityCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.save()
+
+
+def _open_cache(cache: Optional[str], engine: str) -> ContextManager[Optional[StationarityCache]]:
+    """Cache for the duration of a ``with`` block, saved on exit.
+
+    ``None`` if disabled, and always for ``engine="validate"``: a validation
+    run has to execute both engines rather than replay cached results.
+    """
+
+    return StationarityCache(cache) if cache and engine != "validate" else nullcontext()
+
+
+def _pool(workers: int, n_columns: int, engine: str) -> ContextManager[Optional[ProcessPoolExecutor]]:
+    """Process pool for column fan-out, or ``None`` (serial, or a batched engine)."""
+
+    if workers <= 1 or n_columns < 2 or engine != "statsmodels":
+        return nullcontext()
+    # spawn, not fork: the caller may hold a threaded DuckDB connection.
+    context = multiprocessing.get_context("spawn")
+    return ProcessPoolExecutor(max_workers=min(workers, n_columns), mp_context=context)
+
+
+def _fan_out(func: Callable, columns: Sequence[np.ndarray], pool: Optional[ProcessPoolExecutor]) -> List:
+    if pool is None or len(columns) < 2:
+        return [func(values) for values in columns]
+    # Hand columns out in small batches: one ADF is cheap next to a round trip.
+    return list(pool.map(func, columns, chunksize=max(1, len(columns) // 32)))
+
+
+def _run_tests(
+    role: str,
+    frame: pd.DataFrame,
+    pool: Optional[ProcessPoolExecutor],
+    cache: Optional[StationarityCache],
+    engine: str,
+) -> Dict[str, tuple]:
+    """Per-column ``_raw_tests``/``_trans_tests`` results, testing only cache misses.
+
+    ``frame`` is upcast to float64 one column chunk at a time, so a float32
+    matrix is never copied whole.
+    """
+
+    results: Dict[str, tuple] = {}
+    for block in iter_column_chunks(frame, dtype="float64"):
+        results.update(_run_block(role, block, pool, cache, engine))
+    return results
+
+
+def _run_block(
+    role: str,
+    frame: pd.DataFrame,
+    pool: Optional[ProcessPoolExecutor],
+    cache: Optional[StationarityCache],
+    engine: str,
+) -> Dict[str, tuple]:
+    """:func:`_run_tests` for one column chunk.
+
+    The statsmodels engine fans columns out over ``pool``; the batched
+    engines test all misses in one call.
+    """
+
+    columns = [frame[column].to_numpy(dtype=float) for column in frame.columns]
+    todo = list(range(len(columns)))
+    results: List[Optional[tuple]] = [None] * len(columns)
+    if cache is not None:
+        keys = [cache.key(role, values, engine) for values in columns]
+        results = [cache.get(key) for key in keys]
+        todo = [i for i, result in enumerate(results) if result is None]
+    if engine == "statsmodels":
+        fresh = _fan_out(_raw_tests if role == "raw" else _trans_tests, [columns[i] for i in todo], pool)
+    else:
+        block = frame.iloc[:, todo]
+        adf = adf_p_many(block, engine).to_numpy()
+        if role == "raw":
+            fresh = [(p, decide_transform(block.iloc[:, j].astype(float), p)) for j, p in enumerate(adf)]
+        else:
+            fresh = list(zip(adf, kpss_p_many(block, engine).to_numpy()))
+    for i, result in zip(todo, fresh):
+        results[i] = (float(result[0]), result[1] if role == "raw" else float(result[1]))
+        if cache is not None:
+            cache.put(keys[i], role, results[i])
+    return dict(zip(frame.columns, results))
+
+
+def _transform(frame: pd.DataFrame, mapping: Dict[str, str]) -> pd.DataFrame:
+    transformed: Dict[str, pd.Series] = {}
     for column in frame.columns:
         series = frame[column].astype(float)
-        choice = decide_transform(series)
-        mapping[column] = choice
+        choice = mapping[column]
 
         if choice == "none":
             transformed[column] = series
@@ -82,36 +357,115 @@ def apply_transform(frame: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, str]]:
             transformed[column] = series
 
     result = pd.DataFrame(transformed, index=frame.index)
-    result = result.dropna(how="all").dropna(axis=0)
-    return result, mapping
+    return result.dropna(how="all").dropna(axis=0)
+
+
+def apply_transform(
+    frame: pd.DataFrame,
+    *,
+    adf_raw: Optional[Dict[str, float]] = None,
+    workers: int = STATIONARITY_WORKERS,
+    cache: Optional[str] = STATIONARITY_CACHE,
+    engine: str = STATIONARITY_ENGINE,
+) -> Tuple[pd.DataFrame, Dict[str, str]]:
+    """Apply automatic transformations to each column of ``frame``.
+
+    Raw ADF p-values missing from ``adf_raw`` come from ``cache`` or are
+    computed in ``workers`` processes.
+    """
+
+    adf_raw = adf_raw or {}
+    missing = frame[[column for column in frame.columns if column not in adf_raw]]
+    with _pool(workers, missing.shape[1], engine) as pool, _open_cache(cache, engine) as store:
+        tested = _run_tests("raw", missing, pool, store, engine)
+    mapping = {
+        column: (
+            tested[column][1]
+            if column in tested
+            else decide_transform(frame[column].astype(float), adf_raw[column])
+        )
+        for column in frame.columns
+    }
+    return _transform(frame, mapping), mapping
+
+
+def diagnose(
+    frame: pd.DataFrame,
+    workers: int = STATIONARITY_WORKERS,
+    cache: Optional[str] = STATIONARITY_CACHE,
+    engine: str = STATIONARITY_ENGINE,
+) -> Tuple[pd.DataFrame, Dict[str, str], pd.DataFrame]:
+    """Run every stationarity test once per column; return ``(transformed, mapping, report)``.
+
+    The raw ADF pass picks each transform, then ADF and KPSS run on the
+    transformed (jointly trimmed) columns; both passes fan columns out over
+    ``workers`` processes and skip series whose results are in ``cache``.
+    The first two items are what :func:`apply_transform` returns and
+    ``report`` is the :func:`stationarity_report` table, built without
+    testing any series twice.
+    """
+
+    with _pool(workers, frame.shape[1], engine) as pool, _open_cache(cache, engine) as store:
+        raw = _run_tests("raw", frame, pool, store, engine)
+        mapping = {column: raw[column][1] for column in frame.columns}
+        transformed = _transform(frame, mapping)
+        adf_raw = {column: result[0] for column, result in raw.items()}
+        report = _report(transformed, mapping, adf_raw, pool, store, engine)
+    return transformed, mapping, stationarity_report(frame, transformed, mapping, diagnostics=report)
+
+
+def _report(
+    transformed: pd.DataFrame,
+    mapping: Dict[str, str],
+    adf_raw: Dict[str, float],
+    pool: Optional[ProcessPoolExecutor],
+    cache: Optional[StationarityCache],
+    engine: str,
+) -> pd.DataFrame:
+    if transformed.shape[1] == 0:
+        return pd.DataFrame(columns=REPORT_COLUMNS)
+    trans = _run_tests("trans", transformed, pool, cache, engine)
+    return pd.DataFrame(
+        {
+            "var": transformed.columns,
+            "transform": [mapping.get(column, "none") for column in transformed.columns],
+            "adf_p_raw": [adf_raw.get(column, np.nan) for column in transformed.columns],
+            "adf_p_trans": [trans[column][0] for column in transformed.columns],
+            "kpss_p_trans": [trans[column][1] for column in transformed.columns],
+            "n_obs": transformed.notna().sum().to_numpy(dtype=int),
+            "std_trans": transformed.std(ddof=0).to_numpy(dtype=float),
+        },
+        columns=REPORT_COLUMNS,
+    )
 
 
 def stationarity_report(
-    raw: pd.DataFrame, transformed: pd.DataFrame, mapping: Dict[str, str]
+    raw: pd.DataFrame,
+    transformed: pd.DataFrame,
+    mapping: Dict[str, str],
+    *,
+    diagnostics: Optional[pd.DataFrame] = None,
+    workers: int = STATIONARITY_WORKERS,
+    cache: Optional[str] = STATIONARITY_CACHE,
+    engine: str = STATIONARITY_ENGINE,
 ) -> pd.DataFrame:
-    """Return a tidy stationarity diagnostics table."""
-
-    rows = []
-    for column in transformed.columns:
-        rows.append(
-            {
-                "var": column,
-                "transform": mapping.get(column, "none"),
-                "adf_p_raw": adf_p(raw[column]) if column in raw.columns else np.nan,
-                "adf_p_trans": adf_p(transformed[column]),
-                "kpss_p_trans": kpss_p(transformed[column]),
-                "n_obs": int(transformed[column].dropna().shape[0]),
-                "std_trans": float(transformed[column].std(ddof=0)),
-            }
-        )
-    if not rows:
-        return pd.DataFrame(columns=[
-            "var",
-            "transform",
-            "adf_p_raw",
-            "adf_p_trans",
-            "kpss_p_trans",
-            "n_obs",
-            "std_trans",
-        ])
-    return pd.DataFrame(rows).sort_values("adf_p_trans")
+    """Return a tidy stationarity diagnostics table.
+
+    Rows already present in ``diagnostics`` (a previous report, e.g. from
+    :func:`diagnose`) are reused; the remaining columns are read from
+    ``cache`` or tested in ``workers`` processes.
+    """
+
+    known = diagnostics.set_index("var") if diagnostics is not None and not diagnostics.empty else None
+    todo = [c for c in transformed.columns if known is None or c not in known.index]
+    if todo:
+        present = [c for c in todo if c in raw.columns]
+        with _pool(workers, len(todo), engine) as pool, _open_cache(cache, engine) as store:
+            tested = _run_tests("raw", raw[present], pool, store, engine)
+            adf_raw = {c: result[0] for c, result in tested.items()}
+            fresh = _report(transformed[todo], mapping, adf_raw, pool, store, engine).set_index("var")
+        known = fresh if known is None else pd.concat([known, fresh])
+    if known is None:
+        return pd.DataFrame(columns=REPORT_COLUMNS)
+    table = known.loc[list(transformed.columns)].rename_axis("var").reset_index()[REPORT_COLUMNS]
+    return table.sort_values("adf_p_trans")
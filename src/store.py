@@ -2,19 +2,197 @@
 
 from __future__ import annotations
 
+import atexit
 import json
-from typing import Iterable
+import os
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, Optional
 
 import duckdb
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 
-from .config import DB_PATH
+from .config import (
+    DB_MEMORY_LIMIT,
+    DB_PATH,
+    DB_THREADS,
+    OBS_BATCH_BYTES,
+    OBS_BATCH_ROWS,
+    READ_SOURCE,
+    SNAPSHOT_DIR,
+)
+
+_lock = threading.Lock()
+_local = threading.local()
+_writer: Optional[duckdb.DuckDBPyConnection] = None
+_writer_pid: Optional[int] = None
+_readers: dict = {}
+_readers_pid: Optional[int] = None
+
+
+def writer() -> duckdb.DuckDBPyConnection:
+    """Return the process-wide writer connection, opening it on first use.
+
+    The database file is opened once per process so DuckDB's buffer cache
+    survives between operations; a forked child opens its own connection
+    instead of reusing the parent's handle.
+    """
+
+    global _writer, _writer_pid
+    with _lock:
+        if _writer is None or _writer_pid != os.getpid():
+            _writer = duckdb.connect(DB_PATH)
+            _writer_pid = os.getpid()
+            _apply_settings(_writer, DB_THREADS, DB_MEMORY_LIMIT)
+        return _writer
+
+
+def _apply_settings(
+    conn: duckdb.DuckDBPyConnection, threads: int | str | None, memory_limit: str | None
+) -> None:
+    if threads:
+        conn.execute(f"PRAGMA threads={int(threads)}")
+    if memory_limit:
+        conn.execute(f"PRAGMA memory_limit='{str(memory_limit).replace(chr(39), '')}'")
+
+
+def configure(threads: int | None = None, memory_limit: str | None = None) -> None:
+    """Adjust DuckDB ``threads``/``memory_limit`` on the shared connection."""
+
+    _apply_settings(writer(), threads, memory_limit)
+
+
+def cursor() -> duckdb.DuckDBPyConnection:
+    """Return this thread's cursor on the shared connection.
+
+    The cursor is reused by every helper running on the same thread, so
+    callers must not close it.
+    """
+
+    conn = writer()
+    cur = getattr(_local, "cursor", None)
+    if cur is None or getattr(_local, "owner", None) is not conn:
+        cur = conn.cursor()
+        _local.cursor = cur
+        _local.owner = conn
+    return cur
 
 
 def con() -> duckdb.DuckDBPyConnection:
-    """Return a new DuckDB connection bound to the configured database."""
+    """Return a new cursor on the shared connection.
+
+    Closing it only releases the cursor; the database stays open for the
+    rest of the process.
+    """
+
+    return writer().cursor()
+
+
+def reader(source: Optional[str] = None, snapshot_dir: Optional[str] = None) -> duckdb.DuckDBPyConnection:
+    """Return a cursor for analysis reads that never takes the writer lock.
+
+    Inside a process that already holds the writer (step 2) the writer's
+    own view is returned.  Otherwise ``source`` (default ``READ_SOURCE``)
+    decides: ``"database"`` opens the file read-only, ``"snapshot"`` attaches
+    the latest snapshot under ``snapshot_dir`` (default ``SNAPSHOT_DIR``), and
+    ``"auto"`` uses that snapshot only while it matches the database's
+    committed state (or while another process holds the writer), reading the
+    database otherwise.  The source is resolved on every call: snapshot
+    connections are cached per version, which never changes, while
+    database handles are not kept open between calls so they cannot lock a
+    later writer out.
+    """
+
+    if _writer is not None and _writer_pid == os.getpid():
+        return con()
+    from .snapshot import latest_snapshot
+
+    source = source or READ_SOURCE
+    if source not in ("auto", "snapshot", "database"):
+        raise ValueError(f"unknown read source: {source!r} (auto/snapshot/database)")
+    root = snapshot_dir or SNAPSHOT_DIR
+    path = None if source == "database" else latest_snapshot(root)
+    if path is None:
+        if source == "snapshot":
+            raise FileNotFoundError(f"no snapshot under {root!r}; run step 2 or `run_store.py snapshot`")
+        return _open_database()
+    snapshot, state = _snapshot_reader(path)
+    if source == "auto":
+        try:
+            database = _open_database()
+        except duckdb.IOException:
+            return snapshot.cursor()
+        if database.execute(_STORE_STATE_SQL).fetchone() != state:
+            return database
+        database.close()
+    return snapshot.cursor()
+
+
+# Cheap summary of the committed store; equal on a snapshot and the database
+# iff no series was added, dropped or changed since the export.
+_STORE_STATE_SQL = """
+SELECT count(*), coalesce(sum(n_obs), 0), coalesce(bit_xor(hash(series_id, checksum)), 0)
+FROM series_stats
+"""
 
-    return duckdb.connect(DB_PATH)
+
+def _open_database() -> duckdb.DuckDBPyConnection:
+    conn = duckdb.connect(DB_PATH, read_only=True)
+    _apply_settings(conn, DB_THREADS, DB_MEMORY_LIMIT)
+    return conn
+
+
+def _snapshot_reader(path: str) -> tuple:
+    """Return ``(connection, store state)`` of the snapshot at ``path``, opened once per process."""
+
+    from .snapshot import open_snapshot
+
+    global _readers_pid
+    with _lock:
+        if _readers_pid != os.getpid():
+            _readers.clear()
+            _readers_pid = os.getpid()
+        entry = _readers.get(path)
+        if entry is None:
+            for old in _readers.values():
+                old[0].close()
+            _readers.clear()
+            conn = open_snapshot(path)
+            entry = _readers[path] = (conn, conn.execute(_STORE_STATE_SQL).fetchone())
+    return entry
+
+
+@atexit.register
+def close() -> None:
+    """Close the shared connections (checkpointing the writer's WAL)."""
+
+    global _writer, _writer_pid
+    with _lock:
+        if _writer is not None and _writer_pid == os.getpid():
+            _writer.close()
+        _writer = None
+        _writer_pid = None
+        if _readers_pid == os.getpid():
+            for conn, _ in _readers.values():
+                conn.close()
+        _readers.clear()
+
+
+@contextmanager
+def session() -> Iterator[duckdb.DuckDBPyConnection]:
+    """Hold the writer for one short unit of work, then :func:`close` it.
+
+    Long-running callers (the fetchers, the scheduler) use this so the DuckDB
+    file lock is only taken while they actually write and other processes can
+    open the store in between.
+    """
+
+    try:
+        yield writer()
+    finally:
+        close()
 
 
 def init() -> duckdb.DuckDBPyConnection:
@@ -31,49 +209,760 @@ def init() -> duckdb.DuckDBPyConnection:
         );
         """
     )
+    if _has_column(connection, "obs", "series_key"):
+        connection.execute("ALTER TABLE obs RENAME TO obs_legacy")
+    elif _column_type(connection, "obs", "period") == "VARCHAR":
+        connection.execute("ALTER TABLE obs RENAME TO obs_text")
     connection.execute(
         """
+        CREATE TYPE IF NOT EXISTS freq_t AS ENUM ('Y', 'S', 'Q', 'M', 'D', 'F', 'IR');
+        CREATE SEQUENCE IF NOT EXISTS series_id_seq START 1;
+        CREATE TABLE IF NOT EXISTS series (
+          series_id INTEGER PRIMARY KEY DEFAULT nextval('series_id_seq'),
+          logical_name TEXT,
+          dims_hash TEXT,
+          freq freq_t,
+          unit TEXT,
+          dims JSON,
+          UNIQUE (logical_name, dims_hash)
+        );
+        CREATE TABLE IF NOT EXISTS series_dims (
+          series_id INTEGER,
+          dim TEXT,
+          value TEXT
+        );
         CREATE TABLE IF NOT EXISTS obs (
-          series_key TEXT,
-          period TEXT,
-          freq TEXT,
+          series_id INTEGER,
+          period DATE,
           value DOUBLE,
-          unit TEXT,
-          dims JSON
+          PRIMARY KEY (series_id, period)
+        );
+        CREATE TABLE IF NOT EXISTS obs_vintage (
+          series_id INTEGER,
+          period DATE,
+          value DOUBLE,
+          vintage_ts TIMESTAMP
+        );
+        CREATE TABLE IF NOT EXISTS series_stats (
+          series_id INTEGER PRIMARY KEY,
+          n_obs BIGINT,
+          first_period DATE,
+          last_period DATE,
+          n_gaps BIGINT,
+          mean DOUBLE,
+          var DOUBLE,
+          checksum UBIGINT,
+          updated_at TIMESTAMP
+        );
+        CREATE TABLE IF NOT EXISTS name_stats (
+          logical_name TEXT PRIMARY KEY,
+          n_series BIGINT,
+          n_periods BIGINT,
+          n_obs BIGINT,
+          checksum UBIGINT,
+          updated_at TIMESTAMP
+        );
+        CREATE TABLE IF NOT EXISTS vintage_compactions (
+          compacted_at TIMESTAMP,
+          upto TIMESTAMP,
+          rows_before BIGINT,
+          rows_after BIGINT
+        );
+        CREATE OR REPLACE VIEW obs_long AS
+        SELECT s.series_id, s.logical_name, s.logical_name || '|' || s.dims AS series_key,
+               o.period, s.freq, o.value, s.unit, s.dims
+        FROM obs o JOIN series s USING (series_id);
+        """
+    )
+    if _column_type(connection, "series", "freq") == "VARCHAR":
+        connection.execute("ALTER TABLE series ALTER freq TYPE freq_t")
+    if _has_column(connection, "obs_legacy", "series_key"):
+        _migrate_legacy_obs(connection)
+    if _has_column(connection, "obs_text", "period"):
+        _migrate_text_periods(connection)
+    if connection.execute(
+        "SELECT (SELECT count(*) FROM series_stats) = 0 AND EXISTS (SELECT 1 FROM obs)"
+    ).fetchone()[0]:
+        connection.execute("INSERT INTO series_stats " + SERIES_STATS_SELECT.format(where=""))
+    if connection.execute(
+        "SELECT (SELECT count(*) FROM name_stats) = 0 AND EXISTS (SELECT 1 FROM obs)"
+    ).fetchone()[0]:
+        connection.execute("INSERT INTO name_stats " + NAME_STATS_SELECT.format(where=""))
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS fetch_state (
+          key TEXT PRIMARY KEY,
+          logical_name TEXT,
+          prd_se TEXT,
+          last_success TIMESTAMP,
+          last_attempt TIMESTAMP,
+          last_period TEXT,
+          failures INTEGER,
+          next_due TIMESTAMP
+        );
+        """
+    )
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS fetch_failures (
+          src TEXT,
+          key TEXT,
+          row JSON,
+          error_class TEXT,
+          error TEXT,
+          attempts INTEGER,
+          first_failed_at TIMESTAMP,
+          last_failed_at TIMESTAMP,
+          PRIMARY KEY (src, key)
         );
         """
     )
     return connection
 
 
+def _column_type(connection: duckdb.DuckDBPyConnection, table: str, column: str) -> Optional[str]:
+    row = connection.execute(
+        "SELECT data_type FROM information_schema.columns WHERE table_name = ? AND column_name = ?",
+        [table, column],
+    ).fetchone()
+    return row[0] if row else None
+
+
+def _has_column(connection: duckdb.DuckDBPyConnection, table: str, column: str) -> bool:
+    return _column_type(connection, table, column) is not None
+
+
+_OBS_UNPARSED = """
+CREATE TABLE IF NOT EXISTS obs_unparsed (
+  logical_name TEXT,
+  dims JSON,
+  freq TEXT,
+  period TEXT,
+  value DOUBLE,
+  migrated_at TIMESTAMP
+);
+"""
+
+
+def _register_period_anchors(connection: duckdb.DuckDBPyConnection, source: str) -> None:
+    """Register ``period_anchor(period, freq, anchor)`` for TEXT periods of ``source``.
+
+    Before periods were typed, M/Q/Y were stored as ISO dates but S/D/F/IR
+    kept their raw descriptor, so a plain ``TRY_CAST`` would lose them.  The
+    non-ISO ``(period, freq)`` pairs of ``source`` are re-anchored once each
+    through :func:`src.normalize._anchor_from_prd`.
+    """
+
+    from .normalize import _anchor_from_prd
+
+    pairs = connection.execute(
+        f"SELECT DISTINCT period, CAST(freq AS VARCHAR) AS freq FROM ({source}) "
+        "WHERE TRY_CAST(period AS DATE) IS NULL AND period IS NOT NULL"
+    ).df()
+    pairs["anchor"] = [_anchor_from_prd(p, f or "")[0] for p, f in zip(pairs["period"], pairs["freq"])]
+    connection.register("period_anchor", pairs)
+
+
+def _report_unparsed(connection: duckdb.DuckDBPyConnection, table: str) -> None:
+    dropped = connection.execute(f"SELECT count(*) FROM {table} WHERE period IS NULL").fetchone()[0]
+    if dropped:
+        print(f"[store] {dropped} rows with unparseable periods kept in obs_unparsed")
+
+
+def _migrate_text_periods(connection: duckdb.DuckDBPyConnection) -> None:
+    """Convert a TEXT-period ``obs`` (renamed ``obs_text``) to DATE periods.
+
+    Rows whose period cannot be anchored are moved to ``obs_unparsed`` with
+    their series' name and dims instead of being dropped.
+    """
+
+    _register_period_anchors(
+        connection, "SELECT o.period, s.freq FROM obs_text o LEFT JOIN series s USING (series_id)"
+    )
+    connection.execute(
+        "BEGIN TRANSACTION;"
+        + _OBS_UNPARSED
+        + """
+        CREATE OR REPLACE TEMP TABLE m AS
+        SELECT o.series_id, s.logical_name, s.dims, CAST(s.freq AS VARCHAR) AS freq,
+               o.period AS period_raw, o.value,
+               coalesce(TRY_CAST(o.period AS DATE), TRY_CAST(a.anchor AS DATE)) AS period
+        FROM obs_text o
+        LEFT JOIN series s USING (series_id)
+        LEFT JOIN period_anchor a ON a.period = o.period AND a.freq = CAST(s.freq AS VARCHAR);
+        INSERT INTO obs
+        SELECT series_id, period, any_value(value) FROM m
+        WHERE period IS NOT NULL GROUP BY series_id, period ORDER BY series_id, period;
+        INSERT INTO obs_unparsed
+        SELECT logical_name, dims, freq, period_raw, value, CAST(now() AS TIMESTAMP)
+        FROM m WHERE period IS NULL;
+        """
+    )
+    _report_unparsed(connection, "m")
+    connection.execute("DROP TABLE m; DROP TABLE obs_text; COMMIT;")
+    connection.unregister("period_anchor")
+
+
+def _migrate_legacy_obs(connection: duckdb.DuckDBPyConnection) -> None:
+    """Move a pre-dictionary ``obs`` (TEXT ``series_key`` per row) into series/obs.
+
+    The legacy key is ``logical_name|<sorted dims JSON>``, so hashing the
+    suffix reproduces :func:`src.normalize.dims_hash` exactly.  Periods are
+    anchored as in :func:`_migrate_text_periods`; the rest go to
+    ``obs_unparsed``.
+    """
+
+    _register_period_anchors(connection, "SELECT period, freq FROM obs_legacy")
+    connection.execute(
+        "BEGIN TRANSACTION;"
+        + _OBS_UNPARSED
+        + """
+        CREATE OR REPLACE TEMP TABLE m AS
+        SELECT split_part(o.series_key, '|', 1) AS logical_name,
+               substr(o.series_key, strpos(o.series_key, '|') + 1) AS dims,
+               CAST(o.freq AS VARCHAR) AS freq, o.period AS period_raw, o.value, o.unit,
+               coalesce(TRY_CAST(o.period AS DATE), TRY_CAST(a.anchor AS DATE)) AS period
+        FROM obs_legacy o
+        LEFT JOIN period_anchor a ON a.period = o.period AND a.freq = CAST(o.freq AS VARCHAR);
+        INSERT INTO obs_unparsed
+        SELECT logical_name, dims, freq, period_raw, value, CAST(now() AS TIMESTAMP)
+        FROM m WHERE period IS NULL;
+        """
+    )
+    _report_unparsed(connection, "m")
+    connection.execute(
+        """
+        CREATE OR REPLACE TEMP TABLE t AS
+        SELECT logical_name, md5(dims) AS dims_hash, dims, period, freq, value, unit
+        FROM m
+        WHERE period IS NOT NULL
+        QUALIFY row_number() OVER (PARTITION BY logical_name, dims, period) = 1;
+        DROP TABLE m;
+        """
+        + _UPSERT_FROM_T
+        + """
+        DROP TABLE obs_legacy;
+        COMMIT;
+        """
+    )
+    connection.unregister("period_anchor")
+
+
+def load_fetch_state() -> pd.DataFrame:
+    """Return the scheduler bookkeeping rows (one per catalog series)."""
+
+    return cursor().execute("SELECT * FROM fetch_state").df()
+
+
+def save_fetch_state(state: dict) -> None:
+    """Insert or replace the scheduler bookkeeping row for ``state["key"]``."""
+
+    cursor().execute(
+        """
+        INSERT OR REPLACE INTO fetch_state
+          (key, logical_name, prd_se, last_success, last_attempt, last_period, failures, next_due)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        [
+            state["key"],
+            state.get("logical_name"),
+            state.get("prd_se"),
+            state.get("last_success"),
+            state.get("last_attempt"),
+            state.get("last_period"),
+            int(state.get("failures") or 0),
+            state.get("next_due"),
+        ],
+    )
+
+
+def record_failure(src: str, key: str, row: dict, exc: BaseException) -> None:
+    """Add a failed fetch to the dead-letter table, bumping its attempt count."""
+
+    cursor().execute(
+        """
+        INSERT INTO fetch_failures VALUES (?, ?, ?, ?, ?, 1, now(), now())
+        ON CONFLICT (src, key) DO UPDATE SET
+            row = excluded.row,
+            error_class = excluded.error_class,
+            error = excluded.error,
+            attempts = attempts + 1,
+            last_failed_at = excluded.last_failed_at
+        """,
+        [src, key, json.dumps(row, ensure_ascii=False, default=str), type(exc).__name__, str(exc)[:2000]],
+    )
+
+
+def clear_failure(src: str, key: str) -> None:
+    """Drop ``key`` from the dead-letter table after a successful fetch."""
+
+    cursor().execute("DELETE FROM fetch_failures WHERE src = ? AND key = ?", [src, key])
+
+
+def pending_failures(src: str) -> pd.DataFrame:
+    """Return the dead-letter rows recorded for ``src``, oldest first."""
+
+    return cursor().execute(
+        "SELECT * FROM fetch_failures WHERE src = ? ORDER BY first_failed_at", [src]
+    ).df()
+
+
+def due_failures(src: str, max_attempts: int, delay: Callable[[int], float]) -> pd.DataFrame:
+    """Return the dead-letter rows of ``src`` that may be retried now.
+
+    A row is due once it has failed fewer than ``max_attempts`` times and
+    ``last_failed_at + delay(attempts)`` has passed; rows still backing off
+    stay in the table for a later run instead of being waited for.
+    """
+
+    failed = pending_failures(src)
+    now = cursor().execute("SELECT CAST(now() AS TIMESTAMP)").fetchone()[0]
+    wait = pd.to_timedelta([delay(int(n)) for n in failed["attempts"]], unit="s")
+    due = (failed["attempts"] < max_attempts) & (failed["last_failed_at"] + wait <= now)
+    return failed[due.to_numpy()]
+
+
+class FailureLog:
+    """Dead-letter bookkeeping for a long fetch without holding the store open.
+
+    Every :meth:`record`/:meth:`clear` queues the change and applies the whole
+    queue in a short :func:`session`.  While another process holds the DuckDB
+    lock the changes stay queued and go out with the next call; :meth:`flush`
+    reports whether anything is still unwritten at the end of the run.
+    """
+
+    def __init__(self, src: str):
+        self.src = src
+        self._queue: list = []
+        self._ready = False
+
+    def record(self, key: str, row: dict, exc: BaseException) -> None:
+        self._queue.append((key, row, exc))
+        self.flush()
+
+    def clear(self, key: str) -> None:
+        self._queue.append((key, None, None))
+        self.flush()
+
+    def flush(self) -> bool:
+        if not self._queue:
+            return True
+        try:
+            with session():
+                if not self._ready:
+                    init()
+                    self._ready = True
+                for key, row, exc in self._queue:
+                    if exc is None:
+                        clear_failure(self.src, key)
+                    else:
+                        record_failure(self.src, key, row, exc)
+        except duckdb.IOException:
+            return False
+        self._queue.clear()
+        return True
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+
 def save_raw(src: str, key: str, df_json: Iterable[dict]) -> None:
     """Persist the original JSON payload for traceability."""
 
-    connection = con()
-    connection.execute(
+    cursor().execute(
         "INSERT INTO raw_kosis VALUES (?, ?, now(), ?)",
         [src, key, json.dumps(list(df_json), ensure_ascii=False)],
     )
-    connection.close()
+
+
+# Register the series of the deduplicated batch in temp table ``t``
+# (logical_name, dims_hash, dims, freq, unit, period as ISO text, value):
+# take over a changed unit/freq of known series (a blank unit or unknown
+# freq never overwrites a known one), insert unseen series and explode their
+# dims into ``series_dims``.
+_REGISTER_SERIES = """
+CREATE OR REPLACE TEMP TABLE batch_series AS
+SELECT logical_name, dims_hash, TRY_CAST(any_value(freq) AS freq_t) AS freq,
+       any_value(unit) AS unit, any_value(dims) AS dims
+FROM t GROUP BY logical_name, dims_hash;
+UPDATE series s
+SET freq = coalesce(b.freq, s.freq), unit = coalesce(nullif(b.unit, ''), s.unit)
+FROM batch_series b
+WHERE s.logical_name = b.logical_name AND s.dims_hash = b.dims_hash
+  AND (s.freq IS DISTINCT FROM coalesce(b.freq, s.freq)
+       OR s.unit IS DISTINCT FROM coalesce(nullif(b.unit, ''), s.unit));
+CREATE OR REPLACE TEMP TABLE new_series AS
+SELECT * FROM batch_series b ANTI JOIN series s USING (logical_name, dims_hash);
+INSERT INTO series (logical_name, dims_hash, freq, unit, dims)
+SELECT logical_name, dims_hash, freq, unit, dims FROM new_series;
+INSERT INTO series_dims
+SELECT s.series_id, j.key, j.value ->> '$'
+FROM series s SEMI JOIN new_series USING (logical_name, dims_hash), json_each(s.dims) j;
+DROP TABLE new_series;
+DROP TABLE batch_series;
+"""
+
+# Per-series summary of ``obs``: size, span, missing periods inside the span
+# (calendar frequencies only), mean/population variance of non-NaN values and
+# an XOR of row hashes that changes whenever any value does.
+SERIES_STATS_SELECT = """
+SELECT o.series_id,
+       count(*) AS n_obs,
+       min(o.period) AS first_period,
+       max(o.period) AS last_period,
+       CASE any_value(s.freq)
+         WHEN 'M' THEN date_diff('month', min(o.period), max(o.period)) + 1
+         WHEN 'Q' THEN date_diff('month', min(o.period), max(o.period)) // 3 + 1
+         WHEN 'S' THEN date_diff('month', min(o.period), max(o.period)) // 6 + 1
+         WHEN 'Y' THEN date_diff('year', min(o.period), max(o.period)) + 1
+         WHEN 'D' THEN date_diff('day', min(o.period), max(o.period)) + 1
+       END - count(*) AS n_gaps,
+       avg(o.value) FILTER (WHERE NOT isnan(o.value)) AS mean,
+       var_pop(o.value) FILTER (WHERE NOT isnan(o.value)) AS var,
+       bit_xor(hash(o.series_id, o.period, o.value)) AS checksum,
+       CAST(now() AS TIMESTAMP) AS updated_at
+FROM obs o JOIN series s USING (series_id)
+{where}
+GROUP BY o.series_id
+"""
+
+# Per-logical-name summary of ``obs``: distinct periods across all of the
+# name's series (its length in the wide matrix) and the name's row count and
+# XOR of row hashes, which is what the wide cache fingerprints.
+NAME_STATS_SELECT = """
+SELECT s.logical_name,
+       count(DISTINCT o.series_id) AS n_series,
+       count(DISTINCT o.period) AS n_periods,
+       count(*) AS n_obs,
+       bit_xor(hash(o.series_id, o.period, o.value)) AS checksum,
+       CAST(now() AS TIMESTAMP) AS updated_at
+FROM obs o JOIN series s USING (series_id)
+{where}
+GROUP BY s.logical_name
+"""
+
+# Recompute ``series_stats`` for the series in temp table ``touched`` and
+# ``name_stats`` for their logical names.
+_REFRESH_TOUCHED_STATS = (
+    "DELETE FROM series_stats WHERE series_id IN (SELECT series_id FROM touched);\n"
+    "INSERT INTO series_stats "
+    + SERIES_STATS_SELECT.format(where="WHERE o.series_id IN (SELECT series_id FROM touched)")
+    + ";\nCREATE OR REPLACE TEMP TABLE touched_names AS "
+    "SELECT DISTINCT logical_name FROM series SEMI JOIN touched USING (series_id);\n"
+    "DELETE FROM name_stats WHERE logical_name IN (SELECT logical_name FROM touched_names);\n"
+    "INSERT INTO name_stats "
+    + NAME_STATS_SELECT.format(where="WHERE s.logical_name IN (SELECT logical_name FROM touched_names)")
+    + ";\nDROP TABLE touched_names;\nDROP TABLE touched;\n"
+)
+
+# Upsert ``t`` on the (series_id, period) primary key, inserting in key order
+# so obs stays clustered and its zone maps stay selective.
+_UPSERT_FROM_T = _REGISTER_SERIES + """
+INSERT INTO obs (series_id, period, value)
+SELECT s.series_id, CAST(t.period AS DATE) AS period, t.value
+FROM t JOIN series s USING (logical_name, dims_hash)
+ORDER BY s.series_id, period
+ON CONFLICT (series_id, period) DO UPDATE SET value = excluded.value;
+CREATE OR REPLACE TEMP TABLE touched AS
+SELECT DISTINCT s.series_id FROM t JOIN series s USING (logical_name, dims_hash);
+""" + _REFRESH_TOUCHED_STATS + """
+DROP TABLE t;
+"""
+
+# Append ``t`` to the vintage log without touching existing rows; now() is the
+# transaction start, so one bulk ingest shares a single vintage_ts.
+_APPEND_FROM_T = _REGISTER_SERIES + """
+INSERT INTO obs_vintage (series_id, period, value, vintage_ts)
+SELECT s.series_id, CAST(t.period AS DATE), t.value, CAST(now() AS TIMESTAMP)
+FROM t JOIN series s USING (logical_name, dims_hash);
+DROP TABLE t;
+"""
+
+
+def cluster_obs() -> None:
+    """Rewrite ``obs`` in ``(series_id, period)`` order.
+
+    Upserts append in key order per batch, but batches interleave series over
+    time; an occasional rewrite restores one contiguous run per series so
+    DuckDB's per-row-group min/max zone maps can skip most of the table for
+    series or date-range filters.
+    """
+
+    cursor().execute(
+        """
+        BEGIN TRANSACTION;
+        CREATE TABLE obs_sorted (
+          series_id INTEGER,
+          period DATE,
+          value DOUBLE,
+          PRIMARY KEY (series_id, period)
+        );
+        INSERT INTO obs_sorted SELECT * FROM obs ORDER BY series_id, period;
+        DROP TABLE obs;
+        ALTER TABLE obs_sorted RENAME TO obs;
+        COMMIT;
+        """
+    )
 
 
 def upsert_obs(df: pd.DataFrame) -> None:
     """Upsert a normalised observation dataframe into DuckDB."""
 
-    connection = con()
+    connection = cursor()
     connection.register("df", df)
-    connection.execute(  # DuckDB v0.9+ MERGE support
+    connection.execute("CREATE OR REPLACE TEMP TABLE t AS SELECT * FROM df;" + _UPSERT_FROM_T)
+    connection.unregister("df")
+
+
+def _refresh_from_vintages(connection, rows_before=None, rows_after=None) -> int:
+    """Upsert into ``obs`` the latest value of every key with vintages newer
+    than the last refresh, refresh their stats and log the new watermark."""
+
+    since = connection.execute("SELECT max(upto) FROM vintage_compactions").fetchone()[0]
+    upto = connection.execute(
+        "SELECT max(vintage_ts) FROM obs_vintage WHERE vintage_ts > coalesce(CAST(? AS TIMESTAMP), TIMESTAMP '-infinity')",
+        [since],
+    ).fetchone()[0]
+    if upto is None:
+        return 0
+    connection.execute(
+        """
+        CREATE OR REPLACE TEMP TABLE latest AS
+        SELECT series_id, period, arg_max(value, vintage_ts) AS value
+        FROM obs_vintage
+        WHERE vintage_ts > coalesce(CAST(? AS TIMESTAMP), TIMESTAMP '-infinity') AND vintage_ts <= ?
+        GROUP BY series_id, period
+        """,
+        [since, upto],
+    )
+    rows = connection.execute("SELECT count(*) FROM latest").fetchone()[0]
+    connection.execute(
         """
-        CREATE TEMP TABLE t AS SELECT * FROM df;
-        MERGE INTO obs o USING t s
-        ON o.series_key = s.series_key AND o.period = s.period
-        WHEN MATCHED THEN UPDATE SET
-            value = s.value,
-            unit = s.unit,
-            dims = s.dims,
-            freq = s.freq
-        WHEN NOT MATCHED THEN INSERT (series_key, period, freq, value, unit, dims)
-        VALUES (s.series_key, s.period, s.freq, s.value, s.unit, s.dims);
+        INSERT INTO obs (series_id, period, value)
+        SELECT series_id, period, value FROM latest ORDER BY series_id, period
+        ON CONFLICT (series_id, period) DO UPDATE SET value = excluded.value;
+        CREATE OR REPLACE TEMP TABLE touched AS SELECT DISTINCT series_id FROM latest;
+        DROP TABLE latest;
         """
     )
-    connection.close()
+    connection.execute(_REFRESH_TOUCHED_STATS)
+    connection.execute(
+        "INSERT INTO vintage_compactions VALUES (CAST(now() AS TIMESTAMP), ?, ?, ?)",
+        [upto, rows_before, rows_after],
+    )
+    return int(rows)
+
+
+def refresh_obs_from_vintages() -> int:
+    """Bring ``obs`` up to date with vintages appended since the last refresh.
+
+    Only keys with newer vintages are read and upserted, so this is cheap
+    enough to run after every ``--vintage`` ingest; the log itself is left
+    alone (see :func:`compact_vintages`).  Each refresh is recorded in
+    ``vintage_compactions`` with ``NULL`` row counts.  Returns the number of
+    keys upserted.
+    """
+
+    connection = con()
+    try:
+        connection.execute("BEGIN TRANSACTION")
+        rows = _refresh_from_vintages(connection)
+        connection.execute("COMMIT")
+    except Exception:
+        connection.execute("ROLLBACK")
+        raise
+    finally:
+        connection.close()
+    return rows
+
+
+def compact_vintages() -> dict:
+    """Compact ``obs_vintage`` and refresh the materialised latest values.
+
+    Vintages that repeat the previous value of the same series/period carry
+    no revision and are dropped; the remaining log is rewritten in
+    ``(series_id, period, vintage_ts)`` order for fast as-of scans.  This
+    rewrites the whole log, so it is a maintenance job (``run_store.py
+    compact``) rather than part of ingest.  Keys with vintages newer than the
+    last refresh are then upserted into ``obs`` as in
+    :func:`refresh_obs_from_vintages`.
+    """
+
+    connection = con()
+    try:
+        connection.execute("BEGIN TRANSACTION")
+        before = connection.execute("SELECT count(*) FROM obs_vintage").fetchone()[0]
+        connection.execute(
+            """
+            CREATE TABLE obs_vintage_compact AS
+            SELECT series_id, period, value, vintage_ts FROM (
+                SELECT *, lag(value) OVER w AS prev, row_number() OVER w AS rn
+                FROM obs_vintage
+                WINDOW w AS (PARTITION BY series_id, period ORDER BY vintage_ts)
+            )
+            WHERE rn = 1 OR value IS DISTINCT FROM prev
+            ORDER BY series_id, period, vintage_ts;
+            DROP TABLE obs_vintage;
+            ALTER TABLE obs_vintage_compact RENAME TO obs_vintage;
+            """
+        )
+        after = connection.execute("SELECT count(*) FROM obs_vintage").fetchone()[0]
+        if not _refresh_from_vintages(connection, before, after):
+            connection.execute(
+                """
+                INSERT INTO vintage_compactions
+                SELECT CAST(now() AS TIMESTAMP), max(upto), ?, ? FROM vintage_compactions
+                """,
+                [before, after],
+            )
+        connection.execute("COMMIT")
+    except Exception:
+        connection.execute("ROLLBACK")
+        raise
+    finally:
+        connection.close()
+    return {"rows_before": int(before), "rows_after": int(after)}
+
+
+def obs_as_of(as_of: str, series_ids: Iterable[int] | None = None) -> pd.DataFrame:
+    """Return ``(series_id, period, value)`` as known at timestamp ``as_of``."""
+
+    params: list = [as_of]
+    where = ""
+    if series_ids is not None:
+        where = "AND list_contains(?, series_id)"
+        params.append([int(sid) for sid in series_ids])
+    return cursor().execute(
+        f"""
+        SELECT series_id, period, arg_max(value, vintage_ts) AS value
+        FROM obs_vintage
+        WHERE vintage_ts <= CAST(? AS TIMESTAMP) {where}
+        GROUP BY series_id, period
+        ORDER BY series_id, period
+        """,
+        params,
+    ).df()
+
+
+def refresh_series_stats(series_ids: Iterable[int] | None = None) -> None:
+    """Recompute ``series_stats`` for ``series_ids`` (all series by default).
+
+    ``name_stats`` is refreshed for the logical names of those series.
+    Ingest keeps both tables current on its own; this is for repairs and for
+    stores written before the tables existed.
+    """
+
+    connection = cursor()
+    if series_ids is None:
+        connection.execute(
+            "BEGIN TRANSACTION; DELETE FROM series_stats; INSERT INTO series_stats "
+            + SERIES_STATS_SELECT.format(where="")
+            + "; DELETE FROM name_stats; INSERT INTO name_stats "
+            + NAME_STATS_SELECT.format(where="")
+            + "; COMMIT;"
+        )
+        return
+    connection.execute(
+        "CREATE OR REPLACE TEMP TABLE touched AS SELECT DISTINCT unnest(?) AS series_id",
+        [[int(sid) for sid in series_ids]],
+    )
+    connection.execute(_REFRESH_TOUCHED_STATS)
+
+
+def load_series_stats(source: str = READ_SOURCE) -> pd.DataFrame:
+    """Return ``series_stats`` joined with series names, stalest first."""
+
+    return reader(source).execute(
+        """
+        SELECT s.logical_name, s.freq, s.unit, st.*
+        FROM series_stats st JOIN series s USING (series_id)
+        ORDER BY st.last_period, s.logical_name, st.series_id
+        """
+    ).df()
+
+
+class ObsBulkWriter:
+    """Collect normalised observation batches and write them set-wise.
+
+    Batches are buffered as Arrow tables (numeric pandas columns convert
+    without copying) and applied in one large upsert whenever ``batch_rows``
+    rows or ``batch_bytes`` bytes have accumulated.  Every flush runs inside a
+    single transaction that commits when the ``with`` block exits cleanly and
+    rolls back otherwise.  Within the buffered data the last batch wins for a
+    duplicated series/period, matching repeated ``upsert_obs`` calls.
+
+    With ``vintage=True`` the batches are appended to ``obs_vintage`` instead
+    (no MERGE, one ``vintage_ts`` for the whole transaction); run
+    :func:`refresh_obs_from_vintages` afterwards to refresh ``obs``.
+    """
+
+    def __init__(
+        self,
+        batch_rows: int = OBS_BATCH_ROWS,
+        batch_bytes: int = OBS_BATCH_BYTES,
+        *,
+        vintage: bool = False,
+    ) -> None:
+        self.vintage = vintage
+        self.batch_rows = int(batch_rows)
+        self.batch_bytes = int(batch_bytes)
+        self.flushes = 0
+        self.rows_written = 0
+        self._tables: list[pa.Table] = []
+        self._rows = 0
+        self._bytes = 0
+        self._connection: Optional[duckdb.DuckDBPyConnection] = None
+
+    def __enter__(self) -> "ObsBulkWriter":
+        self._connection = con()
+        self._connection.execute("BEGIN TRANSACTION")
+        return self
+
+    def add(self, df: pd.DataFrame | pa.Table) -> None:
+        """Buffer one normalised batch, flushing when a size limit is reached."""
+
+        if df is None or len(df) == 0:
+            return
+        table = df if isinstance(df, pa.Table) else pa.Table.from_pandas(df, preserve_index=False)
+        self._tables.append(table)
+        self._rows += table.num_rows
+        self._bytes += table.nbytes
+        if self._rows >= self.batch_rows or self._bytes >= self.batch_bytes:
+            self.flush()
+
+    def flush(self) -> None:
+        """Apply everything buffered so far in one set-based upsert."""
+
+        if not self._tables or self._connection is None:
+            return
+        batch = pa.concat_tables(self._tables, promote_options="default")
+        batch = batch.append_column("_seq", pa.array(np.arange(batch.num_rows, dtype=np.int64)))
+        self._tables, self._rows, self._bytes = [], 0, 0
+        connection = self._connection
+        connection.register("batch", batch)
+        connection.execute(
+            """
+            CREATE OR REPLACE TEMP TABLE t AS
+            SELECT * EXCLUDE (_seq) FROM batch
+            QUALIFY row_number() OVER (PARTITION BY logical_name, dims_hash, period ORDER BY _seq DESC) = 1;
+            """
+            + (_APPEND_FROM_T if self.vintage else _UPSERT_FROM_T)
+        )
+        connection.unregister("batch")
+        self.flushes += 1
+        self.rows_written += batch.num_rows
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        connection = self._connection
+        if connection is None:
+            return
+        try:
+            if exc_type is None:
+                self.flush()
+                connection.execute("COMMIT")
+            else:
+                connection.execute("ROLLBACK")
+        finally:
+            self._tables, self._rows, self._bytes = [], 0, 0
+            self._connection = None
+            connection.close()
@@ -0,0 +1,162 @@
+"""Batched NumPy unit-root tests for many equal-length series at once.
+
+The kernels reproduce ``adfuller(x, regression="c", autolag="AIC")`` and
+``kpss(x, regression="c", nlags="auto")`` from statsmodels for a ``(B, n)``
+matrix of finite series.  ADF builds the lagged design of every series in
+one array; a single batched QR of the widest design yields the residual
+sum of squares of every nested lag order, so the AIC search costs one
+factorisation instead of ``maxlag + 1`` regressions per series.  The chosen
+lag orders are then refitted in groups.  Series the batch cannot reproduce
+exactly (rank-deficient designs, degenerate KPSS bandwidths) come back as
+NaN for the caller to test one by one.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+from scipy.stats import norm
+
+# MacKinnon (1994) response-surface coefficients for a constant-only ADF
+# regression with one variable (N=1), copied with their scaling from
+# statsmodels 0.14.5, statsmodels/tsa/adfvalues.py (BSD-3-Clause,
+# Copyright (C) 2006 Jonathan E. Taylor and the statsmodels developers).
+_TAU_MAX = 2.74
+_TAU_MIN = -18.83
+_TAU_STAR = -1.61
+_TAU_SMALLP = np.array([2.1659, 1.4412, 3.8269]) * np.array([1, 1, 1e-2])
+_TAU_LARGEP = np.array([1.7339, 9.3202, -1.2745, -1.0368]) * np.array([1, 1e-1, 1e-1, 1e-2])
+
+KPSS_CRIT = np.array([0.347, 0.463, 0.574, 0.739])
+KPSS_PVALS = np.array([0.10, 0.05, 0.025, 0.01])
+
+_RANK_TOL = 1e-10
+
+
+def adf_maxlag(n: int) -> int:
+    """Schwert's rule as used by statsmodels, capped for a constant-only regression."""
+
+    return min(n // 2 - 2, int(np.ceil(12.0 * np.power(n / 100.0, 1 / 4.0))))
+
+
+def mackinnon_p(stats: np.ndarray) -> np.ndarray:
+    """MacKinnon (1994) approximate p-values of ADF statistics (constant, N=1)."""
+
+    stats = np.asarray(stats, dtype=float)
+    small = np.polyval(_TAU_SMALLP[::-1], stats)
+    large = np.polyval(_TAU_LARGEP[::-1], stats)
+    p_values = norm.cdf(np.where(stats <= _TAU_STAR, small, large))
+    p_values = np.where(stats > _TAU_MAX, 1.0, p_values)
+    return np.where(stats < _TAU_MIN, 0.0, p_values)
+
+
+def _design(x: np.ndarray, lags: int) -> tuple[np.ndarray, np.ndarray]:
+    """ADF regressors ``[1, x_{t-1}, dx_{t-1}, ..., dx_{t-lags}]`` and ``dx_t``."""
+
+    dx = np.diff(x, axis=1)
+    m = dx.shape[1]
+    columns = [np.ones((x.shape[0], m - lags)), x[:, lags:-1]]
+    columns += [dx[:, lags - i : m - i] for i in range(1, lags + 1)]
+    return np.stack(columns, axis=2), dx[:, lags:]
+
+
+def _full_rank(r: np.ndarray) -> np.ndarray:
+    diag = np.abs(np.diagonal(r, axis1=1, axis2=2))
+    return diag.min(axis=1) > _RANK_TOL * np.maximum(diag.max(axis=1), 1.0)
+
+
+def _level_tstat(x: np.ndarray, lags: int) -> np.ndarray:
+    """t-statistic of ``x_{t-1}`` in the ADF regression with ``lags`` lags."""
+
+    design, y = _design(x, lags)
+    q, r = np.linalg.qr(design)
+    ok = _full_rank(r)
+    r[~ok] = np.eye(r.shape[1])
+    qty = np.einsum("bnk,bn->bk", q, y)
+    beta = np.linalg.solve(r, qty[..., None])[..., 0]
+    resid = y - np.einsum("bnk,bk->bn", design, beta)
+    dof = y.shape[1] - design.shape[2]
+    sigma2 = (resid**2).sum(axis=1) / dof
+    r_inv = np.linalg.inv(r)
+    se = np.sqrt(sigma2 * (r_inv[:, 1, :] ** 2).sum(axis=1))
+    return np.where(ok, beta[:, 1] / se, np.nan)
+
+
+def adf_stats(x: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """ADF statistics and AIC-selected lag orders of the rows of ``x``."""
+
+    x = np.asarray(x, dtype=float)
+    b, n = x.shape
+    maxlag = adf_maxlag(n)
+    if b == 0 or maxlag < 0:
+        return np.full(b, np.nan), np.zeros(b, dtype=int)
+
+    # Every lag order is compared on the sample of the longest one.
+    design, y = _design(x, maxlag)
+    nobs = y.shape[1]
+    q, r = np.linalg.qr(design)
+    qty = np.einsum("bnk,bn->bk", q, y)
+    ssr_full = ((y - np.einsum("bnk,bk->bn", q, qty)) ** 2).sum(axis=1)
+    # SSR with the first k regressors = full SSR + the dropped projections.
+    tail = np.cumsum((qty**2)[:, ::-1], axis=1)[:, ::-1]
+    ssr = ssr_full[:, None] + np.concatenate([tail[:, 2:], np.zeros((b, 1))], axis=1)
+    k = np.arange(2, maxlag + 3)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        aic = nobs * (np.log(2 * np.pi) + np.log(ssr / nobs) + 1) + 2 * k
+    lags = np.argmin(aic, axis=1)
+
+    stats = np.full(b, np.nan)
+    valid = _full_rank(r) & np.isfinite(aic).all(axis=1)
+    for lag in np.unique(lags[valid]):
+        rows = np.flatnonzero(valid & (lags == lag))
+        stats[rows] = _level_tstat(x[rows], int(lag))
+    return stats, lags
+
+
+def adf_pvalues(x: np.ndarray) -> np.ndarray:
+    """ADF p-values of the rows of ``x`` (NaN where the batch cannot reproduce statsmodels)."""
+
+    stats, _ = adf_stats(x)
+    return np.where(np.isfinite(stats), mackinnon_p(np.nan_to_num(stats)), np.nan)
+
+
+def _autocov(resid: np.ndarray, lag: int) -> np.ndarray:
+    n = resid.shape[1]
+    return (resid[:, lag:] * resid[:, : n - lag]).sum(axis=1)
+
+
+def kpss_stats(x: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Level-stationarity KPSS statistics and Hobijn et al. bandwidths of the rows of ``x``."""
+
+    x = np.asarray(x, dtype=float)
+    b, n = x.shape
+    resid = x - x.mean(axis=1, keepdims=True)
+    sum_sq = (resid**2).sum(axis=1)
+
+    s0 = sum_sq / n
+    s1 = np.zeros(b)
+    for i in range(1, int(np.power(n, 2.0 / 9.0)) + 1):
+        prod = _autocov(resid, i) / (n / 2.0)
+        s0 = s0 + prod
+        s1 = s1 + i * prod
+    with np.errstate(invalid="ignore", divide="ignore"):
+        s_hat = s1 / s0
+        gamma = 1.1447 * np.power(s_hat * s_hat, 1.0 / 3.0) * np.power(n, 1.0 / 3.0)
+    valid = np.isfinite(gamma)
+    lags = np.minimum(np.where(valid, gamma, 0).astype(int), n - 1)
+
+    sigma = sum_sq.copy()
+    for i in range(1, int(lags.max(initial=0)) + 1):
+        weight = np.where(i <= lags, 1.0 - i / (lags + 1.0), 0.0)
+        sigma += 2 * _autocov(resid, i) * weight
+    sigma /= n
+    eta = (np.cumsum(resid, axis=1) ** 2).sum(axis=1) / n**2
+    with np.errstate(invalid="ignore", divide="ignore"):
+        stats = np.where(valid, eta / sigma, np.nan)
+    return stats, lags
+
+
+def kpss_pvalues(x: np.ndarray) -> np.ndarray:
+    """KPSS p-values of the rows of ``x``, interpolated in the KPSS (1992) table."""
+
+    stats, _ = kpss_stats(x)
+    return np.where(np.isfinite(stats), np.interp(np.nan_to_num(stats), KPSS_CRIT, KPSS_PVALS), np.nan)
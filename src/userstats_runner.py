@@ -1,7 +1,13 @@
 from __future__ import annotations
-import os, csv, re
+import os, csv, json, re
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from typing import List, Dict, Any, Optional
+from . import store
+from .config import RATE_SLEEP
 from .kosis_api import fetch_userstats
+from .utils import RateLimiter, backoff_delay
+
+FAIL_SRC = "userstats"
 
 USERSTATS_RE = re.compile(r"^[\w\-]+/\d+/DT_[A-Z0-9_]+/.+$")  # 느슨한 검증
 
@@ -41,6 +47,63 @@ def _flatten_rows(rows: List[Dict[str, Any]]):
     return sorted(keys), rows
 
 
+class _StreamingCsv:
+    """Append rows to a CSV as they arrive, widening the header on new keys.
+
+    Rows are flushed after every batch so a crash keeps everything written so
+    far.  A previously unseen key triggers a one-off rewrite of the file with
+    the widened (sorted) header; userstats payloads share almost all of their
+    columns, so this happens a handful of times per run at most.  With
+    ``append`` an existing file is extended under its current header.
+    """
+
+    def __init__(self, path: str, append: bool = False):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.fields: List[str] = []
+        self.rows = 0
+        self._writer: Optional[csv.DictWriter] = None
+        if append and os.path.isfile(path) and os.path.getsize(path):
+            with open(path, "r", newline="", encoding="utf-8") as f:
+                self.fields = next(csv.reader(f), [])
+            self._fh = open(path, "a", newline="", encoding="utf-8")
+            self._writer = csv.DictWriter(self._fh, fieldnames=self.fields)
+        else:
+            self._fh = open(path, "w", newline="", encoding="utf-8")
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        cols, recs = _flatten_rows(rows)
+        if self._writer is None or not set(cols) <= set(self.fields):
+            self._widen(sorted(set(self.fields) | set(cols)))
+        self._writer.writerows(recs)
+        self._fh.flush()
+        self.rows += len(recs)
+
+    def _widen(self, fields: List[str]) -> None:
+        self._fh.close()
+        if self.fields:
+            tmp = self.path + ".tmp"
+            with open(self.path, "r", newline="", encoding="utf-8") as src, open(
+                tmp, "w", newline="", encoding="utf-8"
+            ) as dst:
+                w = csv.DictWriter(dst, fieldnames=fields)
+                w.writeheader()
+                w.writerows(csv.DictReader(src))
+            os.replace(tmp, self.path)
+            self._fh = open(self.path, "a", newline="", encoding="utf-8")
+            self._writer = csv.DictWriter(self._fh, fieldnames=fields)
+        else:
+            self._fh = open(self.path, "w", newline="", encoding="utf-8")
+            self._writer = csv.DictWriter(self._fh, fieldnames=fields)
+            self._writer.writeheader()
+        self.fields = fields
+
+    def close(self) -> None:
+        self._fh.close()
+
+
 def run_userstats_batch(
     userstats_args: Optional[List[str]],
     *,
@@ -49,40 +112,79 @@ def run_userstats_batch(
     prdSe=None,
     startPrdDe=None,
     endPrdDe=None,
+    workers: int = 4,
+    retry_failed: bool = False,
+    max_attempts: int = 8,
 ) -> int:
-    lst = _load_userstats_list(userstats_args)
+    # DB는 실패 기록을 읽고 쓸 때만 잠깐 열고 닫음 (수집 내내 DuckDB 잠금을 잡지 않음)
+    with store.session():
+        store.init()
+        failed = store.pending_failures(FAIL_SRC)
+        if retry_failed:
+            due = store.due_failures(FAIL_SRC, max_attempts, backoff_delay)
+    attempts = dict(zip(failed["key"], failed["attempts"])) if not failed.empty else {}
+    failures = store.FailureLog(FAIL_SRC)
+    cli_params = {"prdSe": prdSe, "startPrdDe": startPrdDe, "endPrdDe": endPrdDe}
+    params: Dict[str, Dict[str, Any]] = {}
+    if retry_failed:
+        # 재시도 모드: max_attempts 미만으로 실패했고 backoff 대기가 끝난 userStatsId만,
+        # 실패 당시의 조회 조건 그대로 다시 받아 덧붙임 (대기 중인 항목은 기록에 남겨 다음 실행으로)
+        for usid, payload in zip(due["key"], due["row"]):
+            stored = json.loads(payload) if payload else {}
+            params[usid] = {name: stored.get(name) for name in cli_params}
+        lst = list(params)
+    else:
+        lst = _load_userstats_list(userstats_args)
     if verbose:
-        print(f"[userstats] input count={len(lst)}")
-    all_rows: List[Dict[str, Any]] = []
-    for i, usid in enumerate(lst, 1):
-        if verbose:
-            print(f"[userstats] ({i}/{len(lst)}) fetch userStatsId={usid}")
-        try:
-            rows = fetch_userstats(
-                usid,
-                prdSe=prdSe,
-                startPrdDe=startPrdDe,
-                endPrdDe=endPrdDe,
-                verbose=verbose,
-            ) or []
-            for r in rows:
-                r["_userStatsId"] = usid
-            all_rows.extend(rows)
-        except Exception as e:
-            print(f"[userstats][warn] {usid} err={e}")
+        print(f"[userstats] input count={len(lst)} workers={workers} retry={retry_failed}")
+    limiter = RateLimiter(RATE_SLEEP)
+    sink = _StreamingCsv(out, append=retry_failed) if out else None
+    total = 0
+
+    def _fetch(usid: str) -> List[Dict[str, Any]]:
+        limiter.wait()
+        rows = fetch_userstats(usid, **params.get(usid, cli_params), verbose=verbose) or []
+        for r in rows:
+            r["_userStatsId"] = usid
+        return rows
+
+    # 동시 실행 중인 요청 수를 workers*2로 제한 → 결과를 받는 즉시 기록하므로 메모리 상한 유지
+    todo = iter(enumerate(lst, 1))
+    pending: Dict[Any, tuple] = {}
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            while True:
+                for i, usid in todo:
+                    if verbose:
+                        print(f"[userstats] ({i}/{len(lst)}) fetch userStatsId={usid}")
+                    pending[pool.submit(_fetch, usid)] = (i, usid)
+                    if len(pending) >= max(1, workers) * 2:
+                        break
+                if not pending:
+                    break
+                done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                for fut in done:
+                    i, usid = pending.pop(fut)
+                    try:
+                        rows = fut.result()
+                    except Exception as e:
+                        print(f"[userstats][warn] {usid} err={e}")
+                        failures.record(usid, {"userStatsId": usid, **params.get(usid, cli_params)}, e)
+                        continue
+                    if usid in attempts:
+                        failures.clear(usid)
+                    total += len(rows)
+                    if sink is not None:
+                        sink.write(rows)
+    finally:
+        if sink is not None:
+            sink.close()
+        if not failures.flush():
+            print(f"[userstats][warn] DB 잠금으로 실패 기록 {len(failures)} 건을 저장하지 못함")
     if out:
-        import os
-
-        os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
-        cols, recs = _flatten_rows(all_rows)
-        with open(out, "w", newline="", encoding="utf-8") as f:
-            w = csv.DictWriter(f, fieldnames=cols)
-            w.writeheader()
-            w.writerows(recs)
         if verbose:
-            print(f"[userstats] saved: {out} rows={len(all_rows)}")
+            print(f"[userstats] saved: {out} rows={total}")
     else:
         if verbose:
-            print(f"[userstats] done. rows={len(all_rows)} (no file)")
+            print(f"[userstats] done. rows={total} (no file)")
     return 0
-
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 
 import json
+import threading
 import time
 from typing import Any
 
@@ -12,6 +13,33 @@ import requests
 from .config import MAX_RETRIES, RATE_SLEEP, TIMEOUT
 
 
+def backoff_delay(attempts: int, base: float = 2.0, cap: float = 60.0) -> float:
+    """Exponential back-off (seconds) before retry number ``attempts + 1``."""
+
+    if attempts <= 0:
+        return 0.0
+    return min(base * 2 ** (attempts - 1), cap)
+
+
+class RateLimiter:
+    """Thread-safe pacing guard enforcing a minimum gap between API calls."""
+
+    def __init__(self, min_interval: float = RATE_SLEEP) -> None:
+        self.min_interval = float(min_interval)
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self) -> None:
+        """Block until the next call slot is available, then claim it."""
+
+        with self._lock:
+            now = time.monotonic()
+            if self._next > now:
+                time.sleep(self._next - now)
+                now = time.monotonic()
+            self._next = now + self.min_interval
+
+
 def get_json(
     url: str,
     params: dict[str, Any],
@@ -0,0 +1,15 @@
+import pytest
+
+from src import store
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A fresh DuckDB store for one test, opened as this process's writer."""
+
+    store.close()
+    monkeypatch.setattr(store, "DB_PATH", str(tmp_path / "kosis.duckdb"))
+    store.init()
+    yield store
+    store.close()
+
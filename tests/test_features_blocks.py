@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features import FREQ_MONTHS, align_blocks, convert_block
+
+
+def _block(freq: str, start: str, columns: dict) -> pd.DataFrame:
+    n = len(next(iter(columns.values())))
+    index = pd.date_range(start, periods=n, freq=f"{FREQ_MONTHS[freq]}ME", name="period")
+    return pd.DataFrame(columns, index=index, dtype=float)
+
+
+@pytest.mark.parametrize("how", ["mean", "sum", "last"])
+def test_partial_edge_bucket_is_nan(how):
+    # January..July: Q3 holds July only and must not be reported as a quarter.
+    block = _block("M", "2020-01-31", {"x": np.arange(1, 8)})
+    out = convert_block(block, "M", "Q", how)
+    assert list(out.index.strftime("%Y-%m-%d")) == ["2020-03-31", "2020-06-30", "2020-09-30"]
+    expected = {"mean": [2.0, 5.0], "sum": [6.0, 15.0], "last": [3.0, 6.0]}[how]
+    assert out["x"].iloc[:2].tolist() == expected
+    assert np.isnan(out["x"].iloc[2])
+
+
+def test_empty_and_gapped_buckets_are_nan_under_sum():
+    values = {
+        "empty": [1, 2, 3, np.nan, np.nan, np.nan, 7, 8, 9],
+        "gap": [1, 2, 3, 4, np.nan, 6, 7, 8, 9],
+    }
+    out = convert_block(_block("M", "2020-01-31", values), "M", "Q", "sum")
+    assert out["empty"].tolist()[0] == 6.0 and np.isnan(out["empty"].iloc[1]) and out["empty"].iloc[2] == 24.0
+    assert np.isnan(out["gap"].iloc[1]) and out["gap"].iloc[2] == 24.0
+
+
+def test_quarters_to_years_and_alignment():
+    quarterly = _block("Q", "2019-06-30", {"q": [1, 2, 3, 4, 5, 6, 7]})
+    out = convert_block(quarterly, "Q", "Y", "sum")
+    # 2019 starts in Q2, so only 2020 is a whole year.
+    assert np.isnan(out.loc["2019-12-31", "q"])
+    assert out.loc["2020-12-31", "q"] == 4 + 5 + 6 + 7
+    monthly = _block("M", "2020-01-31", {"m": np.ones(24)})
+    aligned = align_blocks({"Q": quarterly, "M": monthly}, "Y", agg="sum")
+    assert aligned.loc["2020-12-31", "m"] == 12.0
+    assert np.isnan(aligned.loc["2019-12-31", "q"])
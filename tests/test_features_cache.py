@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+from src.features import _read_wide_cache, _write_wide_cache, build_wide
+from src.normalize import normalize_frame
+
+
+def monthly(name: str, values, start: str = "2015-01") -> pd.DataFrame:
+    """Normalised observations of one monthly series starting at ``start``."""
+
+    periods = pd.period_range(start, periods=len(values), freq="M").strftime("%Y%m")
+    raw = pd.DataFrame({"PRD_DE": periods, "DT": [str(v) for v in np.asarray(values, dtype=float)]})
+    return normalize_frame(name, raw, "M")
+
+
+def _series(seed: int, n: int = 48) -> np.ndarray:
+    return 100 + np.cumsum(np.random.default_rng(seed).normal(size=n))
+
+
+def test_changed_fingerprint_invalidates_only_that_column(db, tmp_path):
+    cache = str(tmp_path / "wide.parquet")
+    for seed, name in enumerate(["a.index", "b.index", "c.index"]):
+        db.upsert_obs(monthly(name, _series(seed)))
+    first = build_wide(10, cache=cache)
+    raw, fingerprints = _read_wide_cache(cache)
+
+    # Tamper with the cached pivot: reused columns keep the marker,
+    # re-read ones lose it.
+    _write_wide_cache(cache, raw * 2, fingerprints)
+
+    db.upsert_obs(monthly("b.index", _series(7)))
+    second = build_wide(10, cache=cache)
+    _, refreshed = _read_wide_cache(cache)
+
+    assert refreshed["b.index"] != fingerprints["b.index"]
+    assert {n: refreshed[n] for n in ("a.index", "c.index")} == {
+        n: fingerprints[n] for n in ("a.index", "c.index")
+    }
+    for name in ("a.index", "c.index"):
+        pd.testing.assert_series_equal(second[name], first[name] * 2)
+    fresh = build_wide(10, cache=None)
+    pd.testing.assert_series_equal(second["b.index"], fresh["b.index"])
+    assert not np.allclose(second["b.index"], first["b.index"])
+
+
+def test_unchanged_store_reuses_cache_without_rewriting(db, tmp_path):
+    cache = str(tmp_path / "wide.parquet")
+    for seed, name in enumerate(["a.index", "b.index"]):
+        db.upsert_obs(monthly(name, _series(seed)))
+    first = build_wide(10, cache=cache)
+    mtime = (tmp_path / "wide.parquet").stat().st_mtime_ns
+
+    pd.testing.assert_frame_equal(build_wide(10, cache=cache), first)
+    assert (tmp_path / "wide.parquet").stat().st_mtime_ns == mtime
+
+
+def test_dtype_applies_to_cache_and_mismatched_cache_is_rebuilt(db, tmp_path):
+    cache = str(tmp_path / "wide.parquet")
+    for seed, name in enumerate(["a.index", "b.index"]):
+        db.upsert_obs(monthly(name, _series(seed)))
+    compact = build_wide(10, cache=cache, dtype="float32")
+    assert set(compact.dtypes) == {np.dtype("float32")}
+    raw, _ = _read_wide_cache(cache)
+    assert set(raw.dtypes) == {np.dtype("float32")}
+    assert list(raw.columns) == ["a.index", "b.index"]
+
+    full = build_wide(10, cache=cache, dtype="float64")
+    pd.testing.assert_frame_equal(full, build_wide(10, cache=None, dtype="float64"))
+    base = ["a.index", "b.index"]
+    np.testing.assert_allclose(compact[base].to_numpy(), full[base].to_numpy(), rtol=1e-6)
+
+
+def test_unreadable_cache_is_a_miss_and_is_rewritten(db, tmp_path):
+    cache = tmp_path / "cache" / "wide.parquet"
+    cache.parent.mkdir()
+    db.upsert_obs(monthly("a.index", _series(0)))
+    cache.write_bytes(b"PAR1 torn write")
+    assert _read_wide_cache(str(cache)) is None
+
+    pd.testing.assert_frame_equal(build_wide(10, cache=str(cache)), build_wide(10, cache=None))
+    assert _read_wide_cache(str(cache)) is not None
+    assert [p.name for p in cache.parent.iterdir()] == ["wide.parquet"]
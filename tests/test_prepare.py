@@ -0,0 +1,84 @@
+import argparse
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+import run_step2_prepare as prepare
+from src.normalize import normalize_frame
+
+
+def _hashes(frames) -> set:
+    out = set()
+    for frame in frames:
+        norm = normalize_frame("n", frame, "M")
+        out |= set(zip(norm["dims_hash"], norm["period"], norm["dims"]))
+    return out
+
+
+@pytest.mark.parametrize(
+    "files",
+    [
+        # C2 is an int dim absent from the first file: the full read makes it float.
+        [
+            [{"C1": 1, "PRD_DE": "202001", "DT": "1"}],
+            [{"C1": 1, "C2": 7, "PRD_DE": "202002", "DT": "2"}, {"C1": 2, "C2": 8, "PRD_DE": "202002", "DT": "3"}],
+        ],
+        # C1 is null in one file only.
+        [
+            [{"C1": 1, "PRD_DE": "202001", "DT": "1"}],
+            [{"C1": None, "PRD_DE": "202002", "DT": "2"}, {"C1": 2, "PRD_DE": "202003", "DT": "3"}],
+        ],
+        # String codes keep their leading zeros in both paths.
+        [
+            [{"C1": "001", "PRD_DE": "202001", "DT": "1"}],
+            [{"C1": "001", "ITM_ID": "T1", "PRD_DE": "202002", "DT": "2"}],
+        ],
+    ],
+)
+def test_stream_and_full_json_reads_give_the_same_dims_hashes(tmp_path, files):
+    for i, records in enumerate(files):
+        (tmp_path / f"{i}.json").write_text(json.dumps(records), encoding="utf-8")
+    pattern = str(tmp_path / "*.json")
+    full = _hashes([prepare._load_raw(pattern)])
+    assert full and _hashes(prepare._iter_raw(pattern, 1)) == full
+
+
+def test_csv_codes_stay_strings_in_both_paths(tmp_path):
+    path = tmp_path / "raw.csv"
+    path.write_text("C1,PRD_DE,DT\n001,202001,1\n002,202002,2\n", encoding="utf-8")
+    full = prepare._load_raw(str(path))
+    assert full["C1"].tolist() == ["001", "002"]
+    assert _hashes([full]) == _hashes(prepare._iter_raw(str(path), 1))
+
+
+def test_worker_chunks_match_in_process_normalisation(capsys):
+    class Sink:
+        def __init__(self):
+            self.frames = []
+
+        def add(self, frame):
+            self.frames.append(frame.to_pandas() if isinstance(frame, pa.Table) else frame)
+
+        def obs(self):
+            return pd.concat(self.frames).sort_values(["logical_name", "dims_hash", "period"]).reset_index(drop=True)
+
+    raw = pd.DataFrame(
+        {
+            "logical_name": ["a", "a", "b", "b", "bad"],
+            "prdSe": ["M", "M", "Q", "Q", "X"],
+            "C1": ["001", None, "002", "002", "003"],
+            "PRD_DE": ["202001", "202002", "202001", "202002", "202001"],
+            "DT": ["1", "2", "3", "4", "5"],
+        }
+    )
+    args = argparse.Namespace(prdSe=None, logical_name="x", workers=2)
+    serial, pooled = Sink(), Sink()
+    assert prepare._normalise_chunks([raw.copy()], serial, args) == len(raw)
+    with ProcessPoolExecutor(2, mp_context=multiprocessing.get_context("spawn")) as pool:
+        assert prepare._normalise_chunks([raw.copy()], pooled, args, pool) == len(raw)
+    pd.testing.assert_frame_equal(pooled.obs(), serial.obs())
+    assert capsys.readouterr().out.count("skip logical_name=bad prdSe=X") == 2
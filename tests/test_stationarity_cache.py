@@ -0,0 +1,22 @@
+import numpy as np
+
+from src.stationarity import StationarityCache, _open_cache
+
+
+def test_cache_keys_by_engine_and_persists_recency(tmp_path):
+    path = str(tmp_path / "stationarity.parquet")
+    values = np.cumsum(np.random.default_rng(0).normal(size=60))
+    assert StationarityCache.key("raw", values, "numpy") != StationarityCache.key("raw", values, "statsmodels")
+
+    with _open_cache(path, "numpy") as cache:
+        cache.put(StationarityCache.key("raw", values, "numpy"), "raw", (0.5, "diff"))
+    with _open_cache(path, "validate") as bypass:
+        assert bypass is None
+
+    cache = StationarityCache(path)
+    before = cache.entries[StationarityCache.key("raw", values, "numpy")][4]
+    assert cache.get(StationarityCache.key("raw", values, "numpy")) == (0.5, "diff")
+    assert cache.dirty
+    cache.save()
+    assert StationarityCache(path).entries[StationarityCache.key("raw", values, "numpy")][4] > before
+    assert [p.name for p in tmp_path.iterdir()] == ["stationarity.parquet"]
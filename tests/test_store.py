@@ -0,0 +1,135 @@
+import subprocess
+import sys
+
+import duckdb
+import pandas as pd
+import pytest
+
+from src import snapshot
+from src.features import _STATS_TOP_SQL
+
+
+def _obs(name: str, dims: str, periods, values) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "logical_name": name,
+            "dims_hash": dims,
+            "period": periods,
+            "freq": "M",
+            "value": values,
+            "unit": "",
+            "dims": "{}",
+        }
+    )
+
+
+def _name_stats(connection) -> dict:
+    rows = connection.execute("SELECT logical_name, n_series, n_periods, n_obs FROM name_stats").fetchall()
+    return {row[0]: row[1:] for row in rows}
+
+
+def test_name_stats_track_distinct_periods_across_series(db, tmp_path):
+    # "multi" has two series on overlapping months: 3 distinct periods, 4 rows.
+    db.upsert_obs(_obs("multi", "a", ["2020-01-31", "2020-02-29"], [1.0, 2.0]))
+    db.upsert_obs(_obs("multi", "b", ["2020-02-29", "2020-03-31"], [3.0, 4.0]))
+    db.upsert_obs(_obs("single", "a", ["2020-01-31", "2020-02-29"], [5.0, 6.0]))
+    assert _name_stats(db.cursor()) == {"multi": (2, 3, 4), "single": (1, 2, 2)}
+    top = db.cursor().execute(_STATS_TOP_SQL, [10]).fetchall()
+    assert [name for name, _ in top] == ["multi", "single"]
+
+    db.upsert_obs(_obs("single", "a", ["2020-03-31", "2020-04-30"], [7.0, 8.0]))
+    assert _name_stats(db.cursor())["single"] == (1, 4, 4)
+    assert db.cursor().execute(_STATS_TOP_SQL, [1]).fetchall()[0][0] == "single"
+
+    db.cursor().execute("DELETE FROM name_stats")
+    db.refresh_series_stats([1])
+    assert set(_name_stats(db.cursor())) == {"multi"}
+    db.refresh_series_stats()
+    assert _name_stats(db.cursor())["single"] == (1, 4, 4)
+
+    path = snapshot.export_snapshot(str(tmp_path / "snapshots"))
+    frozen = snapshot.open_snapshot(path)
+    assert _name_stats(frozen) == _name_stats(db.cursor())
+    assert frozen.execute(_STATS_TOP_SQL, [10]).fetchall() == db.cursor().execute(_STATS_TOP_SQL, [10]).fetchall()
+
+
+def test_default_reader_falls_back_to_snapshot_while_writer_is_held(db, tmp_path, monkeypatch):
+    db.upsert_obs(_obs("single", "a", ["2020-01-31"], [1.0]))
+    root = str(tmp_path / "snapshots")
+    snapshot.export_snapshot(root)
+    monkeypatch.setattr(db, "SNAPSHOT_DIR", root)
+    db.close()
+
+    code = "import duckdb, sys, time; c = duckdb.connect(sys.argv[1]); print('locked', flush=True); time.sleep(30)"
+    holder = subprocess.Popen([sys.executable, "-c", code, db.DB_PATH], stdout=subprocess.PIPE, text=True)
+    try:
+        assert holder.stdout.readline().strip() == "locked"
+        with pytest.raises(duckdb.IOException):
+            db.reader("database")
+        assert db.reader().execute("SELECT count(*) FROM obs").fetchone()[0] == 1
+    finally:
+        holder.kill()
+        holder.wait()
+
+
+def test_failure_log_waits_for_lock_and_due_failures_honour_backoff(db):
+    db.close()
+    code = "import duckdb, sys, time; c = duckdb.connect(sys.argv[1]); print('locked', flush=True); time.sleep(30)"
+    holder = subprocess.Popen([sys.executable, "-c", code, db.DB_PATH], stdout=subprocess.PIPE, text=True)
+    log = db.FailureLog("fetch")
+    try:
+        assert holder.stdout.readline().strip() == "locked"
+        log.record("a", {"tblId": "a"}, RuntimeError("boom"))
+        assert len(log) == 1
+    finally:
+        holder.kill()
+        holder.wait()
+    log.record("b", {"tblId": "b"}, RuntimeError("boom"))
+    assert len(log) == 0 and db._writer is None
+
+    with db.session():
+        db.cursor().execute(
+            "UPDATE fetch_failures SET last_failed_at = last_failed_at - INTERVAL 10 SECOND WHERE key = 'a'"
+        )
+        due = db.due_failures("fetch", 8, lambda n: 5.0)
+        assert list(due["key"]) == ["a"]
+        assert db.due_failures("fetch", 1, lambda n: 0.0).empty
+
+
+def test_vintage_refresh_is_incremental_and_compaction_keeps_obs(db):
+    def ingest(values):
+        with db.ObsBulkWriter(vintage=True) as sink:
+            sink.add(_obs("v", "a", ["2020-01-31", "2020-02-29"], values))
+
+    def latest():
+        return db.cursor().execute("SELECT value FROM obs ORDER BY period").fetchall()
+
+    ingest([1.0, 2.0])
+    assert db.refresh_obs_from_vintages() == 2
+    ingest([1.0, 3.0])
+    assert db.refresh_obs_from_vintages() == 2
+    assert db.refresh_obs_from_vintages() == 0
+    assert latest() == [(1.0,), (3.0,)]
+    assert db.cursor().execute("SELECT count(*) FROM obs_vintage").fetchone()[0] == 4
+
+    assert db.compact_vintages() == {"rows_before": 4, "rows_after": 3}
+    assert latest() == [(1.0,), (3.0,)]
+    ingest([4.0, 3.0])
+    assert db.refresh_obs_from_vintages() == 2
+    assert latest() == [(4.0,), (3.0,)]
+
+
+def test_registering_a_known_series_takes_over_a_changed_unit_and_freq(db):
+    def series():
+        return db.cursor().execute("SELECT series_id, freq, unit FROM series").fetchall()
+
+    first = _obs("s", "a", ["2020-01-31"], [1.0]).assign(unit="천원")
+    db.upsert_obs(first)
+    (sid, _, _), = series()
+    db.upsert_obs(first.assign(unit="백만원", freq="Q", period="2020-03-31"))
+    assert series() == [(sid, "Q", "백만원")]
+    db.upsert_obs(first.assign(unit="", freq="??", period="2020-06-30"))
+    assert series() == [(sid, "Q", "백만원")]
+    with db.ObsBulkWriter(vintage=True) as sink:
+        sink.add(first)
+    assert series() == [(sid, "M", "천원")]
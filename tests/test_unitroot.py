@@ -0,0 +1,59 @@
+import warnings
+
+import numpy as np
+import pytest
+from statsmodels.tools.sm_exceptions import InterpolationWarning
+from statsmodels.tsa.adfvalues import mackinnonp
+from statsmodels.tsa.stattools import adfuller, kpss
+
+from src import unitroot
+
+
+def _series(n: int) -> np.ndarray:
+    rng = np.random.default_rng(n)
+    noise = rng.normal(size=(5, n))
+    t = np.arange(n)
+    ar = np.zeros(n)
+    for i in range(1, n):
+        ar[i] = 0.6 * ar[i - 1] + noise[2, i]
+    return np.vstack(
+        [
+            noise[0],  # white noise
+            np.cumsum(noise[1]),  # random walk
+            ar,  # stationary AR(1)
+            0.05 * t + np.cumsum(noise[3]),  # random walk with drift
+            100 + 10 * np.sin(t / 6) + noise[4],  # seasonal level
+        ]
+    )
+
+
+@pytest.mark.parametrize("n", [40, 120, 300])
+def test_adf_matches_statsmodels(n):
+    x = _series(n)
+    stats, lags = unitroot.adf_stats(x)
+    p_values = unitroot.adf_pvalues(x)
+    for row, stat, lag, p_value in zip(x, stats, lags, p_values):
+        expected = adfuller(row, regression="c", autolag="AIC")
+        assert lag == expected[2]
+        assert stat == pytest.approx(expected[0], rel=1e-9, abs=1e-12)
+        assert p_value == pytest.approx(expected[1], rel=1e-9, abs=1e-12)
+
+
+@pytest.mark.parametrize("n", [40, 120, 300])
+def test_kpss_matches_statsmodels(n):
+    x = _series(n)
+    stats, lags = unitroot.kpss_stats(x)
+    p_values = unitroot.kpss_pvalues(x)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", InterpolationWarning)
+        for row, stat, lag, p_value in zip(x, stats, lags, p_values):
+            expected = kpss(row, regression="c", nlags="auto")
+            assert lag == expected[2]
+            assert stat == pytest.approx(expected[0], rel=1e-9)
+            assert p_value == pytest.approx(expected[1], rel=1e-9)
+
+
+def test_mackinnon_p_matches_statsmodels_over_the_whole_range():
+    stats = np.linspace(-25, 5, 601)
+    expected = [mackinnonp(stat, regression="c", N=1) for stat in stats]
+    np.testing.assert_allclose(unitroot.mackinnon_p(stats), expected, rtol=1e-12, atol=0)